@@ -2,14 +2,42 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
 
+from homeassistant.components import mqtt
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import device_registry as dr
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, MANUFACTURER, MODEL
+from .const import (
+    CONF_CO2_BOOST_LEVEL,
+    CONF_CO2_CONTROL,
+    CONF_CO2_HYSTERESIS,
+    CONF_CO2_MAX_SPEED,
+    CONF_CO2_MIN_SPEED,
+    CONF_CO2_STEP_INTERVAL,
+    CONF_CO2_TARGET,
+    CONF_COMMAND_DEBOUNCE,
+    CONF_HUB_MODE,
+    CONF_STALE_TIMEOUT,
+    DEFAULT_CO2_BOOST_LEVEL,
+    DEFAULT_CO2_CONTROL,
+    DEFAULT_CO2_HYSTERESIS,
+    DEFAULT_CO2_MAX_SPEED,
+    DEFAULT_CO2_MIN_SPEED,
+    DEFAULT_CO2_STEP_INTERVAL,
+    DEFAULT_CO2_TARGET,
+    DEFAULT_COMMAND_DEBOUNCE,
+    DEFAULT_HUB_MODE,
+    DEFAULT_STALE_TIMEOUT,
+    DOMAIN,
+    MANUFACTURER,
+    MODEL,
+)
+from .coordinator import BalluASP100Coordinator
+from .services import async_setup_services
+from .watchdog import BalluASP100Watchdog
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,6 +48,43 @@ PLATFORMS: list[Platform] = [
     Platform.SELECT,
 ]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Ballu ASP-100 integration."""
+    hass.data.setdefault(DOMAIN, {})
+    await async_setup_services(hass)
+
+    # One availability timer for all devices
+    watchdog = BalluASP100Watchdog(hass)
+    watchdog.async_start()
+
+    @callback
+    def stop_watchdog(event: Event) -> None:
+        watchdog.async_stop()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, stop_watchdog)
+
+    if not await mqtt.async_wait_for_mqtt_client(hass):
+        _LOGGER.warning("MQTT is not available, passive discovery is disabled")
+        return True
+
+    # Offer unconfigured units seen in normal traffic for setup; the
+    # discovery module pulls in the config flow machinery, so it is only
+    # imported once MQTT is known to be up
+    from .discovery import PassiveDiscovery
+
+    passive_discovery = PassiveDiscovery(hass)
+    await passive_discovery.async_start()
+    hass.data[DOMAIN]["passive_discovery"] = passive_discovery
+
+    @callback
+    def stop_passive_discovery(event: Event) -> None:
+        passive_discovery.async_stop()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, stop_passive_discovery)
+    return True
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Ballu ASP-100 from a config entry."""
     hass.data.setdefault(DOMAIN, {})
@@ -34,10 +99,69 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         model=MODEL,
     )
 
+    # One state subscription per device, shared by all entities
+    coordinator = BalluASP100Coordinator(
+        hass,
+        entry.data["device_id"],
+        entry.data["device_type"],
+        entry.data["name"],
+        entry.options.get(CONF_COMMAND_DEBOUNCE, DEFAULT_COMMAND_DEBOUNCE),
+        entry.options.get(CONF_STALE_TIMEOUT, DEFAULT_STALE_TIMEOUT),
+    )
+    hub = None
+    if entry.options.get(CONF_HUB_MODE, DEFAULT_HUB_MODE):
+        # Fleet hub mode: share one broker-wide subscription between devices
+        hub = hass.data[DOMAIN].get("hub")
+        if hub is None:
+            from .hub import BalluASP100Hub
+
+            hub = hass.data[DOMAIN]["hub"] = BalluASP100Hub(hass)
+            # The hub wildcard sees every device, discovery rides on it
+            if (passive_discovery := hass.data[DOMAIN].get("passive_discovery")):
+                passive_discovery.async_attach_hub(hub)
+
+            @callback
+            def stop_hub(event: Event) -> None:
+                hub.async_stop()
+
+            # Kept across reloads while discovery listens, so released here
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, stop_hub)
+    # Released on unload and also when setup fails half-way
+    entry.async_on_unload(coordinator.async_stop)
+    if entry.options.get(CONF_CO2_CONTROL, DEFAULT_CO2_CONTROL):
+        from .ventilation import BalluASP100VentilationController
+
+        # Attached before subscribing so retained mode and speed are seen
+        options = entry.options
+        coordinator.ventilation = BalluASP100VentilationController(
+            coordinator,
+            target=options.get(CONF_CO2_TARGET, DEFAULT_CO2_TARGET),
+            hysteresis=options.get(CONF_CO2_HYSTERESIS, DEFAULT_CO2_HYSTERESIS),
+            min_speed=options.get(CONF_CO2_MIN_SPEED, DEFAULT_CO2_MIN_SPEED),
+            max_speed=options.get(CONF_CO2_MAX_SPEED, DEFAULT_CO2_MAX_SPEED),
+            step_interval=options.get(
+                CONF_CO2_STEP_INTERVAL, DEFAULT_CO2_STEP_INTERVAL
+            ),
+            boost_level=options.get(CONF_CO2_BOOST_LEVEL, DEFAULT_CO2_BOOST_LEVEL),
+        )
+        coordinator.ventilation.async_start()
+        entry.async_on_unload(coordinator.ventilation.async_stop)
+    await coordinator.async_start(hub)
+    hass.data[DOMAIN][entry.entry_id] = coordinator
+
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
     # Set up platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
\ No newline at end of file
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        hass.data[DOMAIN].pop(entry.entry_id)
+    return unload_ok
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
@@ -5,17 +5,29 @@ import logging
 from typing import Any
 
 from homeassistant.components.climate import (
+    ATTR_CURRENT_TEMPERATURE,
+    ATTR_FAN_MODE,
+    ATTR_PRESET_MODE,
     ClimateEntity,
     ClimateEntityFeature,
     HVACMode,
 )
 from homeassistant.components.climate.const import HVACMode
-from homeassistant.components import mqtt
 from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, State, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
 
-from .const import DOMAIN, FAN_MODE_MAPPING, MODE_MAPPING, PRESET_MODES
+from .codec import (
+    FAN_MODE_BY_VALUE,
+    PRESET_BY_VALUE,
+    encode_fan_mode,
+    encode_preset,
+    encode_temperature,
+)
+from .const import DOMAIN, FAN_MODE_MAPPING, PRESET_MODES
+from .coordinator import BalluASP100Coordinator
+from .entity import BalluASP100Entity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,19 +37,13 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Ballu ASP-100 climate entity from config entry."""
-    data = config_entry.data
+    coordinator: BalluASP100Coordinator = hass.data[DOMAIN][config_entry.entry_id]
     
-    entity = BalluASP100Climate(
-        hass,
-        data["device_id"],
-        data["device_type"],
-        data["name"],
-        config_entry.entry_id,
-    )
+    entity = BalluASP100Climate(coordinator, config_entry.entry_id)
     
     async_add_entities([entity])
 
-class BalluASP100Climate(ClimateEntity):
+class BalluASP100Climate(BalluASP100Entity, ClimateEntity, RestoreEntity):
     """Representation of Ballu ASP-100 climate device."""
 
     _attr_has_entity_name = True
@@ -58,18 +64,13 @@ class BalluASP100Climate(ClimateEntity):
 
     def __init__(
         self,
-        hass: HomeAssistant,
-        device_id: str,
-        device_type: str,
-        name: str,
+        coordinator: BalluASP100Coordinator,
         entry_id: str,
     ) -> None:
         """Initialize the climate device."""
-        self.hass = hass
-        self._device_id = device_id
-        self._device_type = device_type
-        self._attr_name = name
-        self._attr_unique_id = f"ballu_asp100_{device_id}_climate"
+        super().__init__(coordinator)
+        self._attr_name = coordinator.name
+        self._attr_unique_id = f"ballu_asp100_{coordinator.device_id}_climate"
         self._entry_id = entry_id
 
         # State attributes
@@ -78,26 +79,6 @@ class BalluASP100Climate(ClimateEntity):
         self._hvac_mode = HVACMode.OFF
         self._fan_mode = "Off"
         self._preset_mode = "comfort"
-        self._available = True
-
-        # MQTT topics
-        self._command_topic_base = f"rusclimate/{device_type}/{device_id}/control"
-        self._state_topic_base = f"rusclimate/{device_type}/{device_id}/state"
-
-    @property
-    def device_info(self):
-        """Return device info."""
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": self._attr_name,
-            "manufacturer": "Ballu",
-            "model": "ONEAIR ASP-100",
-        }
-
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self._available
 
     @property
     def current_temperature(self) -> float | None:
@@ -129,14 +110,11 @@ class BalluASP100Climate(ClimateEntity):
         _LOGGER.debug("Setting temperature: %s", kwargs)
         
         if (temperature := kwargs.get(ATTR_TEMPERATURE)) is not None:
-            topic = f"{self._command_topic_base}/temperature"
-            
-            await mqtt.async_publish(
-                self.hass,
-                topic,
-                str(int(temperature)),
-                qos=1,
-                retain=False,
+            # Slider drags produce bursts, only the final value is published
+            await self._coordinator.commands.async_publish_debounced(
+                "temperature",
+                encode_temperature(temperature),
+                self._rollback_to(_target_temperature=self._target_temperature),
             )
             
             self._target_temperature = temperature
@@ -146,15 +124,10 @@ class BalluASP100Climate(ClimateEntity):
         """Set new fan mode."""
         _LOGGER.debug("Setting fan mode: %s", fan_mode)
         
-        topic = f"{self._command_topic_base}/speed"
-        fan_value = FAN_MODE_MAPPING.get(fan_mode, 0)
-        
-        await mqtt.async_publish(
-            self.hass,
-            topic,
-            str(fan_value),
-            qos=1,
-            retain=False,
+        await self._coordinator.commands.async_publish_debounced(
+            "speed",
+            encode_fan_mode(fan_mode),
+            self._rollback_to(_fan_mode=self._fan_mode),
         )
         
         self._fan_mode = fan_mode
@@ -164,20 +137,18 @@ class BalluASP100Climate(ClimateEntity):
         """Set new operation mode."""
         _LOGGER.debug("Setting HVAC mode: %s", hvac_mode)
         
-        topic = f"{self._command_topic_base}/mode"
-        
         if hvac_mode == HVACMode.OFF:
-            mode_value = 0
+            mode_value = encode_preset("off")
         else:
             # При включении используем текущий preset mode
-            mode_value = MODE_MAPPING.get(self._preset_mode, 1)
+            mode_value = encode_preset(self._preset_mode)
         
-        await mqtt.async_publish(
-            self.hass,
-            topic,
-            str(mode_value),
-            qos=1,
-            retain=False,
+        await self._coordinator.commands.async_publish(
+            "mode",
+            mode_value,
+            self._rollback_to(
+                _hvac_mode=self._hvac_mode, _preset_mode=self._preset_mode
+            ),
         )
         
         self._hvac_mode = hvac_mode
@@ -187,15 +158,14 @@ class BalluASP100Climate(ClimateEntity):
         """Set new preset mode."""
         _LOGGER.debug("Setting preset mode: %s", preset_mode)
         
-        topic = f"{self._command_topic_base}/mode"
-        mode_value = MODE_MAPPING.get(preset_mode, 1)
+        mode_value = encode_preset(preset_mode)
         
-        await mqtt.async_publish(
-            self.hass,
-            topic,
-            str(mode_value),
-            qos=1,
-            retain=False,
+        await self._coordinator.commands.async_publish(
+            "mode",
+            mode_value,
+            self._rollback_to(
+                _hvac_mode=self._hvac_mode, _preset_mode=self._preset_mode
+            ),
         )
         
         self._preset_mode = preset_mode
@@ -215,88 +185,82 @@ class BalluASP100Climate(ClimateEntity):
         await self.async_set_hvac_mode(HVACMode.OFF)
 
     async def async_added_to_hass(self) -> None:
-        """Subscribe to MQTT topics when entity is added to hass."""
-        _LOGGER.debug("Setting up MQTT subscriptions for device %s", self._device_id)
-        
+        """Register for device state keys when entity is added to hass."""
+        await super().async_added_to_hass()
+        # Start from the last known state; device messages override it
+        if (last_state := await self.async_get_last_state()) is not None:
+            self._async_restore(last_state)
+
         # Temperature state
-        await mqtt.async_subscribe(
-            self.hass,
-            f"{self._state_topic_base}/temperature",
-            self._temperature_message_received,
-        )
+        self._async_listen("temperature", self._temperature_message_received)
         
         # Current temperature from sensor
-        await mqtt.async_subscribe(
-            self.hass,
-            f"{self._state_topic_base}/sensor/temperature", 
-            self._current_temperature_message_received,
+        self._async_listen(
+            "sensor/temperature", self._current_temperature_message_received
         )
         
         # Fan mode state
-        await mqtt.async_subscribe(
-            self.hass,
-            f"{self._state_topic_base}/speed",
-            self._fan_mode_message_received,
-        )
+        self._async_listen("speed", self._fan_mode_message_received)
         
         # Mode state (используется и для HVAC mode и для preset mode)
-        await mqtt.async_subscribe(
-            self.hass,
-            f"{self._state_topic_base}/mode",
-            self._mode_message_received,
-        )
+        self._async_listen("mode", self._mode_message_received)
 
-    def _temperature_message_received(self, message):
+    @callback
+    def _async_restore(self, last_state: State) -> None:
+        """Seed the attributes from the state saved before the restart."""
+        if last_state.state not in self._attr_hvac_modes:
+            return
+        self._hvac_mode = HVACMode(last_state.state)
+        attributes = last_state.attributes
+        if (temperature := attributes.get(ATTR_TEMPERATURE)) is not None:
+            self._target_temperature = temperature
+        self._current_temperature = attributes.get(ATTR_CURRENT_TEMPERATURE)
+        if (fan_mode := attributes.get(ATTR_FAN_MODE)) in FAN_MODE_MAPPING:
+            self._fan_mode = fan_mode
+        if (preset_mode := attributes.get(ATTR_PRESET_MODE)) in PRESET_MODES:
+            self._preset_mode = preset_mode
+        self._coordinator.restored_entities += 1
+
+    @callback
+    def _temperature_message_received(self, temperature: float) -> None:
         """Handle temperature state messages."""
-        try:
-            self._target_temperature = float(message.payload)
-            _LOGGER.debug("Received target temperature: %s", self._target_temperature)
-            self.async_write_ha_state()
-        except ValueError as err:
-            _LOGGER.error("Invalid temperature value: %s - %s", message.payload, err)
+        _LOGGER.debug("Received target temperature: %s", temperature)
+        changed = temperature != self._target_temperature
+        self._target_temperature = temperature
+        self._async_write_if_changed(changed)
 
-    def _current_temperature_message_received(self, message):
+    @callback
+    def _current_temperature_message_received(self, temperature: float) -> None:
         """Handle current temperature messages."""
-        try:
-            self._current_temperature = float(message.payload)
-            _LOGGER.debug("Received current temperature: %s", self._current_temperature)
-            self.async_write_ha_state()
-        except ValueError as err:
-            _LOGGER.error("Invalid current temperature value: %s - %s", message.payload, err)
+        _LOGGER.debug("Received current temperature: %s", temperature)
+        changed = temperature != self._current_temperature
+        self._current_temperature = temperature
+        self._async_write_if_changed(changed)
 
-    def _fan_mode_message_received(self, message):
+    @callback
+    def _fan_mode_message_received(self, fan_value: int) -> None:
         """Handle fan mode state messages."""
-        try:
-            fan_value = int(message.payload)
-            _LOGGER.debug("Received fan mode value: %s", fan_value)
-            
-            # Reverse mapping from value to mode name
-            for mode, value in FAN_MODE_MAPPING.items():
-                if value == fan_value:
-                    self._fan_mode = mode
-                    break
-                    
-            self.async_write_ha_state()
-        except ValueError as err:
-            _LOGGER.error("Invalid fan mode value: %s - %s", message.payload, err)
+        _LOGGER.debug("Received fan mode value: %s", fan_value)
+        
+        if (fan_mode := FAN_MODE_BY_VALUE.get(fan_value)) is None:
+            return
+        changed = fan_mode != self._fan_mode
+        self._fan_mode = fan_mode
+        self._async_write_if_changed(changed)
 
-    def _mode_message_received(self, message):
+    @callback
+    def _mode_message_received(self, mode_value: int) -> None:
         """Handle mode state messages."""
-        try:
-            mode_value = int(message.payload)
-            _LOGGER.debug("Received mode value: %s", mode_value)
-            
-            if mode_value == 0:
-                self._hvac_mode = HVACMode.OFF
-                self._preset_mode = "comfort"
-            else:
-                self._hvac_mode = HVACMode.FAN_ONLY
-                # Reverse mapping from value to preset name
-                for preset, value in MODE_MAPPING.items():
-                    if value == mode_value:
-                        self._preset_mode = preset
-                        break
-                        
-            self.async_write_ha_state()
-        except ValueError as err:
-            _LOGGER.error("Invalid mode value: %s - %s", message.payload, err)
\ No newline at end of file
+        _LOGGER.debug("Received mode value: %s", mode_value)
+        
+        previous = (self._hvac_mode, self._preset_mode)
+        if mode_value == 0:
+            self._hvac_mode = HVACMode.OFF
+            self._preset_mode = "comfort"
+        else:
+            self._hvac_mode = HVACMode.FAN_ONLY
+            self._preset_mode = PRESET_BY_VALUE.get(mode_value, self._preset_mode)
+                    
+        self._async_write_if_changed(
+            (self._hvac_mode, self._preset_mode) != previous
+        )
@@ -0,0 +1,111 @@
+"""Protocol codec for Ballu ASP-100 MQTT topics.
+
+Holds one decoder per state key and one encoder per control key. Decoders
+take the raw payload string and raise ``ValueError`` or ``TypeError`` on
+malformed input; inverse value maps are built once from ``const``.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from .const import FAN_MODE_MAPPING, MODE_MAPPING, SOUND_MAPPING
+
+# Inverse maps: device value -> Home Assistant option
+FAN_MODE_BY_VALUE = {value: mode for mode, value in FAN_MODE_MAPPING.items()}
+PRESET_BY_VALUE = {value: preset for preset, value in MODE_MAPPING.items()}
+SOUND_BY_VALUE = {value: option for option, value in SOUND_MAPPING.items()}
+
+SWITCH_ON = "1"
+SWITCH_OFF = "0"
+
+# Writable state keys, in the order a full control state is applied
+CONTROL_KEYS = ("mode", "speed", "temperature", "amount", "volume", "backlight")
+
+
+def decode_int(payload: str) -> int:
+    """Decode an integer value, tolerating a decimal point."""
+    return int(float(payload))
+
+
+def decode_float(payload: str) -> float:
+    """Decode a float value."""
+    return float(payload)
+
+
+def decode_expendables(payload: str) -> int:
+    """Decode the filter percentage, sent as ``[85]``."""
+    return int(float(payload.strip("[]")))
+
+
+def decode_timer(payload: str) -> int:
+    """Decode the remaining turbo time in seconds."""
+    return int(float(payload))
+
+
+def decode_switch(payload: str) -> bool:
+    """Decode an on/off flag."""
+    return payload == SWITCH_ON
+
+
+def decode_raw(payload: str) -> str:
+    """Pass the payload through unchanged."""
+    return payload
+
+
+DECODERS: dict[str, Callable[[str], Any]] = {
+    "temperature": decode_float,
+    "speed": decode_int,
+    "mode": decode_int,
+    "amount": decode_int,
+    "volume": decode_switch,
+    "backlight": decode_switch,
+    "expendables": decode_expendables,
+    "time": decode_timer,
+    "sensor/temperature": decode_float,
+    "sensor/co2": decode_int,
+    "diag/rssi": decode_int,
+    "diag/mqtt_latency": decode_int,
+    "diag/gw_latency": decode_int,
+    "diag/gw_loss": decode_int,
+}
+
+
+def decode(key: str, payload: str) -> Any:
+    """Decode the payload of a state key."""
+    return DECODERS.get(key, decode_raw)(payload)
+
+
+def payloads_match(received: str, expected: str) -> bool:
+    """Return True if two payloads carry the same value."""
+    if received == expected:
+        return True
+    try:
+        return float(received) == float(expected)
+    except ValueError:
+        return False
+
+
+def encode_temperature(temperature: float) -> str:
+    """Encode a target temperature for ``control/temperature``."""
+    return str(int(temperature))
+
+
+def encode_fan_mode(fan_mode: str) -> str:
+    """Encode a fan mode for ``control/speed``."""
+    return str(FAN_MODE_MAPPING.get(fan_mode, 0))
+
+
+def encode_preset(preset_mode: str) -> str:
+    """Encode a preset for ``control/mode``."""
+    return str(MODE_MAPPING.get(preset_mode, 1))
+
+
+def encode_sound(option: str) -> str:
+    """Encode a sound option for ``control/amount``."""
+    return str(SOUND_MAPPING.get(option, 0))
+
+
+def encode_switch(is_on: bool) -> str:
+    """Encode an on/off flag for ``control/volume`` and ``control/backlight``."""
+    return SWITCH_ON if is_on else SWITCH_OFF
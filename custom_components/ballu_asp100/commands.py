@@ -0,0 +1,383 @@
+"""Command publishing for Ballu ASP-100 control topics."""
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left
+from collections.abc import Awaitable
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+import time
+from typing import Any
+
+from homeassistant.components import mqtt
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .codec import payloads_match
+from .stats import PublishStats
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds to wait for the state echo of a command before retrying
+COMMAND_ACK_TIMEOUT = 5.0
+# Republish attempts before the optimistic state is rolled back
+COMMAND_RETRIES = 1
+
+# Sustained commands per second sent to one device, and the burst allowed
+# on top of it (a full state restore fits into one burst)
+COMMAND_RATE = 4.0
+COMMAND_BURST = 8
+
+# Upper bounds of the command -> echo latency buckets, in milliseconds
+LATENCY_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens per second."""
+
+    __slots__ = ("rate", "burst", "tokens", "_updated")
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token and return 0, or return seconds until one is due."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of command round-trip latency."""
+
+    def __init__(self) -> None:
+        """Initialize the histogram."""
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.last: float | None = None
+
+    def record(self, latency_ms: float) -> None:
+        """Add a sample."""
+        self.counts[bisect_left(LATENCY_BUCKETS, latency_ms)] += 1
+        self.count += 1
+        self.total += latency_ms
+        self.last = latency_ms
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean latency."""
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict[str, int]:
+        """Return bucket counts keyed by their upper bound."""
+        buckets = {f"le_{bound}": n for bound, n in zip(LATENCY_BUCKETS, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return buckets
+
+
+@dataclass
+class _InflightCommand:
+    """A published command waiting for its state echo."""
+
+    payload: str
+    sent_at: float
+    attempts: int
+    rollback: CALLBACK_TYPE | None
+    cancel_timeout: CALLBACK_TYPE | None = None
+
+
+class BalluASP100CommandPublisher:
+    """Publish commands to the control topics of one device.
+
+    Debounced commands are coalesced per control key: only the last payload
+    written within the quiet window is published.
+
+    Every published command is tracked until the device echoes the same value
+    on ``state/<key>``. The echo timeout starts once the command has actually
+    left the queue, so time spent waiting for the rate limit does not count.
+    Unconfirmed commands are republished once and then their optimistic state
+    is rolled back; so are commands that could not be published at all.
+
+    Commands leave through one outbound queue per device, sent one at a time
+    in order and paced by a token bucket. A command to a control key that is
+    still queued replaces the queued payload in place, so bursts collapse to
+    the newest value per topic.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        command_topic_base: str,
+        debounce: float,
+    ) -> None:
+        """Initialize the publisher."""
+        self.hass = hass
+        self._command_topic_base = command_topic_base
+        self._debounce = debounce
+        self._pending: dict[str, tuple[str, CALLBACK_TYPE | None]] = {}
+        self._timers: dict[str, CALLBACK_TYPE] = {}
+        self._inflight: dict[str, _InflightCommand] = {}
+        self._latency_listeners: list[CALLBACK_TYPE] = []
+
+        # Outbound queue: control key -> payload and the callers waiting on it
+        self._queue: dict[str, tuple[str, list[asyncio.Future[None]]]] = {}
+        self._drain_task: asyncio.Task[None] | None = None
+        self._bucket = TokenBucket(COMMAND_RATE, COMMAND_BURST)
+        self.queue_max_depth = 0
+        # Queued payloads replaced by a newer one before they were sent
+        self.dropped = 0
+        self.rate_limited = 0
+
+        self.latency = LatencyHistogram()
+        self.publish_stats: dict[str, PublishStats] = {}
+        self.confirmed = 0
+        self.retried = 0
+        self.rolled_back = 0
+
+    async def async_publish(
+        self, key: str, payload: str, rollback: CALLBACK_TYPE | None = None
+    ) -> None:
+        """Publish a command to ``control/<key>`` right away.
+
+        ``rollback`` restores the optimistic state if the device never
+        confirms the command.
+        """
+        # A direct write supersedes a pending debounced one
+        self._async_cancel_pending(key)
+
+        # Roll back to the state before the oldest unconfirmed command
+        if (previous := self._inflight.pop(key, None)) is not None:
+            if previous.cancel_timeout is not None:
+                previous.cancel_timeout()
+            rollback = previous.rollback or rollback
+
+        self._inflight[key] = _InflightCommand(
+            payload, time.monotonic(), 1, rollback
+        )
+        await self._async_send(key, payload)
+
+    async def async_publish_debounced(
+        self, key: str, payload: str, rollback: CALLBACK_TYPE | None = None
+    ) -> None:
+        """Publish a command once no newer one arrived for the quiet window.
+
+        Without a quiet window the command is published before returning, so
+        publish errors reach the caller.
+        """
+        if not self._debounce:
+            await self.async_publish(key, payload, rollback)
+            return
+
+        _LOGGER.debug("Debouncing %s command: %s", key, payload)
+        # Keep the rollback of the first command of the burst
+        if (pending := self._pending.get(key)) is not None:
+            rollback = pending[1]
+        self._pending[key] = (payload, rollback)
+        if (cancel := self._timers.pop(key, None)) is not None:
+            cancel()
+
+        @callback
+        def flush(_now: datetime) -> None:
+            self._timers.pop(key, None)
+            if (pending := self._pending.pop(key, None)) is not None:
+                self.hass.async_create_task(
+                    self._async_log_failure(key, self.async_publish(key, *pending))
+                )
+
+        self._timers[key] = async_call_later(self.hass, self._debounce, flush)
+
+    @callback
+    def async_handle_echo(self, key: str, payload: str) -> None:
+        """Confirm an in-flight command when the device echoes its value."""
+        inflight = self._inflight.get(key)
+        if inflight is None or not payloads_match(payload, inflight.payload):
+            return
+
+        del self._inflight[key]
+        if inflight.cancel_timeout is not None:
+            inflight.cancel_timeout()
+        self.confirmed += 1
+        self.latency.record((time.monotonic() - inflight.sent_at) * 1000)
+        for listener in self._latency_listeners:
+            listener()
+
+    @callback
+    def async_add_latency_listener(self, listener: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Register a callback run when a latency sample is recorded."""
+        self._latency_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            if listener in self._latency_listeners:
+                self._latency_listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop all pending debounced and in-flight commands."""
+        for cancel in self._timers.values():
+            cancel()
+        self._timers.clear()
+        self._pending.clear()
+        for inflight in self._inflight.values():
+            if inflight.cancel_timeout is not None:
+                inflight.cancel_timeout()
+        self._inflight.clear()
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            self._drain_task = None
+        for _payload, waiters in self._queue.values():
+            for waiter in waiters:
+                waiter.cancel()
+        self._queue.clear()
+
+    async def _async_send(self, key: str, payload: str) -> None:
+        """Queue a payload for a control topic and wait until it is sent.
+
+        A newer payload for the same key queued meanwhile is sent instead,
+        which also completes this call.
+        """
+        waiter: asyncio.Future[None] = self.hass.loop.create_future()
+        if (queued := self._queue.get(key)) is not None:
+            self.dropped += 1
+            _LOGGER.debug("Replacing queued %s command with %s", key, payload)
+            self._queue[key] = (payload, [*queued[1], waiter])
+        else:
+            self._queue[key] = (payload, [waiter])
+            self.queue_max_depth = max(self.queue_max_depth, len(self._queue))
+        if self._drain_task is None:
+            self._drain_task = self.hass.async_create_task(self._async_drain())
+        await waiter
+
+    async def _async_drain(self) -> None:
+        """Send queued commands in order, as fast as the bucket allows."""
+        try:
+            while self._queue:
+                if (delay := self._bucket.take()) > 0:
+                    self.rate_limited += 1
+                    await asyncio.sleep(delay)
+                    continue
+                key = next(iter(self._queue))
+                payload, waiters = self._queue.pop(key)
+                if (inflight := self._inflight.get(key)) is not None:
+                    # Echo latency counts from the send, not from queueing
+                    inflight.sent_at = time.monotonic()
+                try:
+                    await self._async_publish_now(key, payload)
+                except Exception as err:  # noqa: BLE001
+                    if inflight is not None and self._inflight.get(key) is inflight:
+                        self._async_roll_back(key, inflight)
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_exception(err)
+                    continue
+                # Unless the echo already arrived or a newer command took over
+                if inflight is not None and self._inflight.get(key) is inflight:
+                    inflight.cancel_timeout = self._async_schedule_timeout(
+                        key, inflight
+                    )
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+        finally:
+            # A cancelled drain may finish after a new one was started
+            if self._drain_task is asyncio.current_task():
+                self._drain_task = None
+
+    async def _async_publish_now(self, key: str, payload: str) -> None:
+        """Publish a payload to a control topic."""
+        started = time.monotonic()
+        await mqtt.async_publish(
+            self.hass,
+            f"{self._command_topic_base}/{key}",
+            payload,
+            qos=1,
+            retain=False,
+        )
+        if (stats := self.publish_stats.get(key)) is None:
+            stats = self.publish_stats[key] = PublishStats()
+        stats.record((time.monotonic() - started) * 1000)
+
+    def as_diagnostics(self) -> dict[str, Any]:
+        """Return command counters and latencies."""
+        return {
+            "control_topics": {
+                key: stats.as_dict() for key, stats in sorted(self.publish_stats.items())
+            },
+            "in_flight": len(self._inflight),
+            "queue_depth": len(self._queue),
+            "queue_max_depth": self.queue_max_depth,
+            "queue_dropped": self.dropped,
+            "queue_rate_limited": self.rate_limited,
+            "confirmed": self.confirmed,
+            "retried": self.retried,
+            "rolled_back": self.rolled_back,
+            "echo_latency_mean_ms": self.latency.mean,
+            "echo_latency_histogram": self.latency.as_dict(),
+        }
+
+    @callback
+    def _async_schedule_timeout(
+        self, key: str, inflight: _InflightCommand
+    ) -> CALLBACK_TYPE:
+        """Schedule the echo timeout of an in-flight command."""
+
+        @callback
+        def timeout(_now: datetime) -> None:
+            if self._inflight.get(key) is not inflight:
+                return
+
+            if inflight.attempts <= COMMAND_RETRIES:
+                _LOGGER.debug("No echo for %s command, retrying", key)
+                self.retried += 1
+                inflight.attempts += 1
+                inflight.cancel_timeout = None
+                # The drain restarts the timeout once the retry is sent
+                self.hass.async_create_task(
+                    self._async_log_failure(
+                        key, self._async_send(key, inflight.payload)
+                    )
+                )
+                return
+
+            _LOGGER.warning(
+                "Device did not confirm %s command %s, restoring previous state",
+                key,
+                inflight.payload,
+            )
+            self._async_roll_back(key, inflight)
+
+        return async_call_later(self.hass, COMMAND_ACK_TIMEOUT, timeout)
+
+    @callback
+    def _async_roll_back(self, key: str, inflight: _InflightCommand) -> None:
+        """Forget an unconfirmed command and restore its optimistic state."""
+        del self._inflight[key]
+        self.rolled_back += 1
+        if inflight.rollback is not None:
+            inflight.rollback()
+
+    async def _async_log_failure(self, key: str, command: Awaitable[None]) -> None:
+        """Run a command nobody waits for and log a failed publish."""
+        try:
+            await command
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.warning("Could not publish %s command: %s", key, err)
+
+    @callback
+    def _async_cancel_pending(self, key: str) -> None:
+        """Drop a pending debounced command for a control key."""
+        self._pending.pop(key, None)
+        if (cancel := self._timers.pop(key, None)) is not None:
+            cancel()
@@ -2,16 +2,39 @@
 from __future__ import annotations
 
 import logging
-import re
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.service_info.mqtt import MqttServiceInfo
 
-from .const import DOMAIN
+from .const import (
+    CONF_CO2_BOOST_LEVEL,
+    CONF_CO2_CONTROL,
+    CONF_CO2_HYSTERESIS,
+    CONF_CO2_MAX_SPEED,
+    CONF_CO2_MIN_SPEED,
+    CONF_CO2_STEP_INTERVAL,
+    CONF_CO2_TARGET,
+    CONF_COMMAND_DEBOUNCE,
+    CONF_HUB_MODE,
+    CONF_SENSOR_INTERVAL,
+    CONF_STALE_TIMEOUT,
+    DEFAULT_CO2_BOOST_LEVEL,
+    DEFAULT_CO2_CONTROL,
+    DEFAULT_CO2_HYSTERESIS,
+    DEFAULT_CO2_MAX_SPEED,
+    DEFAULT_CO2_MIN_SPEED,
+    DEFAULT_CO2_STEP_INTERVAL,
+    DEFAULT_CO2_TARGET,
+    DEFAULT_COMMAND_DEBOUNCE,
+    DEFAULT_HUB_MODE,
+    DEFAULT_STALE_TIMEOUT,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,6 +48,18 @@ class BalluASP100ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize the config flow."""
+        self._discovered: dict[str, str] = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> BalluASP100OptionsFlow:
+        """Get the options flow for this handler."""
+        return BalluASP100OptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -69,4 +104,146 @@ class BalluASP100ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             description_placeholders={
                 "instructions": "Device ID можно найти в логах MQTT брокера (32 hex символа)"
             }
-        )
\ No newline at end of file
+        )
+
+    async def async_step_mqtt(self, discovery_info: MqttServiceInfo) -> FlowResult:
+        """Handle a device found by the MQTT integration.
+
+        Covers installs without any configured device, where the integration
+        itself is not loaded. Once a configured device is seen the MQTT
+        integration drops its subscription and passive discovery takes over.
+        """
+        from .discovery import DISCOVERY_KEYS, device_info, parse_state_topic
+
+        parsed = parse_state_topic(discovery_info.topic)
+        if parsed is None or parsed[2] not in DISCOVERY_KEYS:
+            return self.async_abort(reason="not_ballu_device")
+        return await self.async_step_integration_discovery(device_info(*parsed[:2]))
+
+    async def async_step_integration_discovery(
+        self, discovery_info: dict[str, str]
+    ) -> FlowResult:
+        """Handle a device found by passive discovery."""
+        await self.async_set_unique_id(f"ballu_asp100_{discovery_info['device_id']}")
+        self._abort_if_unique_id_configured()
+
+        self._discovered = discovery_info
+        self.context["title_placeholders"] = {"name": discovery_info["name"]}
+        return await self.async_step_discovery_confirm()
+
+    async def async_step_discovery_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Confirm setup of a discovered device."""
+        if user_input is not None:
+            name = user_input.get("name", self._discovered["name"]).strip()
+            return self.async_create_entry(
+                title=name,
+                data={
+                    "device_id": self._discovered["device_id"],
+                    "device_type": self._discovered["device_type"],
+                    "name": name,
+                },
+            )
+
+        schema = vol.Schema({
+            vol.Optional("name", default=self._discovered["name"]): str,
+        })
+
+        return self.async_show_form(
+            step_id="discovery_confirm",
+            data_schema=schema,
+            description_placeholders={
+                "device_id": self._discovered["device_id"],
+                "device_type": self._discovered["device_type"],
+            },
+        )
+
+class BalluASP100OptionsFlow(config_entries.OptionsFlow):
+    """Handle Ballu ASP-100 options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        from .sensor import SENSOR_TYPES
+
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            min_speed = user_input.get(CONF_CO2_MIN_SPEED, DEFAULT_CO2_MIN_SPEED)
+            max_speed = user_input.get(CONF_CO2_MAX_SPEED, DEFAULT_CO2_MAX_SPEED)
+            if min_speed > max_speed:
+                errors["base"] = "invalid_speed_bounds"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = user_input or self._entry.options
+        fields = {
+            vol.Optional(
+                CONF_HUB_MODE,
+                default=options.get(CONF_HUB_MODE, DEFAULT_HUB_MODE),
+            ): bool,
+            vol.Optional(
+                CONF_COMMAND_DEBOUNCE,
+                default=options.get(CONF_COMMAND_DEBOUNCE, DEFAULT_COMMAND_DEBOUNCE),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+            vol.Optional(
+                CONF_STALE_TIMEOUT,
+                default=options.get(CONF_STALE_TIMEOUT, DEFAULT_STALE_TIMEOUT),
+            ): vol.All(vol.Coerce(int), vol.Range(min=30, max=86400)),
+        }
+
+        # Built-in CO2 ventilation controller
+        speed_range = vol.All(vol.Coerce(int), vol.Range(min=1, max=7))
+        fields.update({
+            vol.Optional(
+                CONF_CO2_CONTROL,
+                default=options.get(CONF_CO2_CONTROL, DEFAULT_CO2_CONTROL),
+            ): bool,
+            vol.Optional(
+                CONF_CO2_TARGET,
+                default=options.get(CONF_CO2_TARGET, DEFAULT_CO2_TARGET),
+            ): vol.All(vol.Coerce(int), vol.Range(min=400, max=2000)),
+            vol.Optional(
+                CONF_CO2_HYSTERESIS,
+                default=options.get(CONF_CO2_HYSTERESIS, DEFAULT_CO2_HYSTERESIS),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=500)),
+            vol.Optional(
+                CONF_CO2_MIN_SPEED,
+                default=options.get(CONF_CO2_MIN_SPEED, DEFAULT_CO2_MIN_SPEED),
+            ): speed_range,
+            vol.Optional(
+                CONF_CO2_MAX_SPEED,
+                default=options.get(CONF_CO2_MAX_SPEED, DEFAULT_CO2_MAX_SPEED),
+            ): speed_range,
+            vol.Optional(
+                CONF_CO2_STEP_INTERVAL,
+                default=options.get(CONF_CO2_STEP_INTERVAL, DEFAULT_CO2_STEP_INTERVAL),
+            ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+            vol.Optional(
+                CONF_CO2_BOOST_LEVEL,
+                default=options.get(CONF_CO2_BOOST_LEVEL, DEFAULT_CO2_BOOST_LEVEL),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=5000)),
+        })
+
+        # Publish interval of throttled diagnostic sensors (0 disables throttling)
+        for sensor_key, sensor_config in SENSOR_TYPES.items():
+            if "min_interval" not in sensor_config:
+                continue
+            option = CONF_SENSOR_INTERVAL.format(sensor_key)
+            fields[
+                vol.Optional(
+                    option,
+                    default=options.get(option, sensor_config["min_interval"]),
+                )
+            ] = vol.All(vol.Coerce(int), vol.Range(min=0, max=3600))
+
+        schema = vol.Schema(fields)
+
+        return self.async_show_form(
+            step_id="init", data_schema=schema, errors=errors
+        )
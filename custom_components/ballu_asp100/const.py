@@ -36,4 +36,40 @@ SOUND_MAPPING = {
 
 # HVAC modes based on device capabilities
 HVAC_MODES = ["off", "fan_only"]
-PRESET_MODES = ["comfort", "Auto", "sleep", "boost", "eco"]
\ No newline at end of file
+PRESET_MODES = ["comfort", "Auto", "sleep", "boost", "eco"]
+
+# MQTT topic filter matching state topics of every device on the broker
+STATE_TOPIC_FILTER = "rusclimate/+/+/state/#"
+
+# Options
+CONF_HUB_MODE = "hub_mode"
+DEFAULT_HUB_MODE = False
+# Per-sensor minimum publish interval in seconds, formatted with the sensor key
+CONF_SENSOR_INTERVAL = "{}_interval"
+# Quiet window in seconds before a debounced setpoint command is published
+CONF_COMMAND_DEBOUNCE = "command_debounce"
+DEFAULT_COMMAND_DEBOUNCE = 0.5
+
+# Seconds without any state message after which a device is unavailable
+CONF_STALE_TIMEOUT = "stale_timeout"
+DEFAULT_STALE_TIMEOUT = 300
+
+# Built-in CO2 ventilation control
+CONF_CO2_CONTROL = "co2_control"
+DEFAULT_CO2_CONTROL = False
+# CO2 level in ppm the controller keeps the room at
+CONF_CO2_TARGET = "co2_target"
+DEFAULT_CO2_TARGET = 800
+# Half-width in ppm of the band around the target in which speed is held
+CONF_CO2_HYSTERESIS = "co2_hysteresis"
+DEFAULT_CO2_HYSTERESIS = 100
+CONF_CO2_MIN_SPEED = "co2_min_speed"
+DEFAULT_CO2_MIN_SPEED = 1
+CONF_CO2_MAX_SPEED = "co2_max_speed"
+DEFAULT_CO2_MAX_SPEED = 7
+# Minimum seconds between two commands of the controller
+CONF_CO2_STEP_INTERVAL = "co2_step_interval"
+DEFAULT_CO2_STEP_INTERVAL = 60
+# CO2 level in ppm that switches the unit to boost, 0 disables
+CONF_CO2_BOOST_LEVEL = "co2_boost_level"
+DEFAULT_CO2_BOOST_LEVEL = 0
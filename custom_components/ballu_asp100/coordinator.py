@@ -0,0 +1,314 @@
+"""Push coordinator for Ballu ASP-100 MQTT state topics."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from functools import partial
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components import mqtt
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .codec import CONTROL_KEYS, DECODERS, decode_raw
+from .commands import BalluASP100CommandPublisher
+from .const import DEFAULT_STALE_TIMEOUT
+from .history import HISTORY_KEYS, ReadingBuffer
+from .stats import KeyStats
+
+if TYPE_CHECKING:
+    from .hub import BalluASP100Hub
+    from .ventilation import BalluASP100VentilationController
+
+_LOGGER = logging.getLogger(__name__)
+
+MessageCallback = Callable[[Any], None]
+
+_CONTROL_KEYS = frozenset(CONTROL_KEYS)
+
+
+class BalluASP100Coordinator:
+    """Route state messages of one device to the entities that use them.
+
+    Every message is dispatched with one dict lookup on the state key (the
+    part of the topic after ``state/``, e.g. ``sensor/co2``). Payloads are
+    decoded once per message and only for keys that have listeners.
+
+    Topics are subscribed per state key: the writable keys always, every
+    other key only while it has listeners. Keys of disabled entities are
+    never subscribed, so the broker does not even send them, and disabling
+    an entity drops its topics without a reload.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        device_id: str,
+        device_type: str,
+        name: str,
+        command_debounce: float = 0,
+        stale_timeout: float = DEFAULT_STALE_TIMEOUT,
+    ) -> None:
+        """Initialize the coordinator."""
+        self.hass = hass
+        self.device_id = device_id
+        self.device_type = device_type
+        self.name = name
+
+        self.state_topic_base = f"rusclimate/{device_type}/{device_id}/state"
+        self.command_topic_base = f"rusclimate/{device_type}/{device_id}/control"
+        self.commands = BalluASP100CommandPublisher(
+            hass, self.command_topic_base, command_debounce
+        )
+
+        self._key_offset = len(self.state_topic_base) + 1
+
+        # State write counters of all entities of the device
+        self.writes_emitted = 0
+        self.writes_suppressed = 0
+        self.key_stats: dict[str, KeyStats] = {}
+        self._listeners: dict[str, list[MessageCallback]] = {}
+        # Last raw payload of every writable state key
+        self.control_state: dict[str, str] = {}
+        self._unsubscribe: CALLBACK_TYPE | None = None
+        # Per-key subscriptions, None while the subscribe request is in flight
+        self._subscriptions: dict[str, CALLBACK_TYPE | None] = {}
+        self._per_key_subscriptions = False
+
+        # Availability, checked for the whole fleet by the watchdog timer
+        self.available = True
+        self.last_seen = 0.0
+        self.stale_timeout = stale_timeout
+        self._availability_listeners: list[CALLBACK_TYPE] = []
+        self._tick_listeners: list[CALLBACK_TYPE] = []
+
+        # Startup: entities seeded from the last known state, and seconds
+        # from subscribing until the device delivered its first state
+        self.restored_entities = 0
+        self.first_state_seconds: float | None = None
+        self._started_at = 0.0
+
+        # Recent readings for trend queries without the recorder
+        self.history = {key: ReadingBuffer() for key in HISTORY_KEYS}
+
+        # Built-in CO2 controller, set up when enabled in the options
+        self.ventilation: BalluASP100VentilationController | None = None
+
+    async def async_start(self, hub: BalluASP100Hub | None = None) -> None:
+        """Subscribe to the state topics of the device.
+
+        In hub mode the device joins the fleet-wide subscription of ``hub``
+        instead of holding its own ones.
+        """
+        for key, buffer in self.history.items():
+            self.async_add_listener(key, partial(self._record_history, buffer))
+
+        self._started_at = self.last_seen = time.monotonic()
+        if hub is not None:
+            self._unsubscribe = await hub.async_register(self)
+            return
+
+        _LOGGER.debug("Setting up MQTT subscriptions for device %s", self.device_id)
+        self._per_key_subscriptions = True
+        keys = list(CONTROL_KEYS)
+        keys += [key for key in self._listeners if key not in _CONTROL_KEYS]
+        for key in keys:
+            self._subscriptions[key] = None
+        await asyncio.gather(*(self._async_subscribe_key(key) for key in keys))
+
+    @callback
+    def async_stop(self) -> None:
+        """Release the MQTT subscription, listeners and pending commands."""
+        self.commands.async_cancel()
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        for unsubscribe in self._subscriptions.values():
+            if unsubscribe is not None:
+                unsubscribe()
+        self._subscriptions.clear()
+        self._per_key_subscriptions = False
+        self._listeners.clear()
+        self._availability_listeners.clear()
+        self._tick_listeners.clear()
+
+    @property
+    def listener_count(self) -> int:
+        """Return the number of registered state listeners."""
+        return sum(len(listeners) for listeners in self._listeners.values())
+
+    @callback
+    def async_add_listener(
+        self, key: str, listener: MessageCallback
+    ) -> CALLBACK_TYPE:
+        """Register a listener for a state key and return its remover."""
+        self._listeners.setdefault(key, []).append(listener)
+        if self._per_key_subscriptions and key not in self._subscriptions:
+            self._subscriptions[key] = None
+            self.hass.async_create_task(self._async_subscribe_key(key))
+
+        @callback
+        def remove_listener() -> None:
+            listeners = self._listeners.get(key)
+            if listeners is None or listener not in listeners:
+                return
+            listeners.remove(listener)
+            if not listeners:
+                del self._listeners[key]
+                if key not in _CONTROL_KEYS:
+                    self._async_unsubscribe_key(key)
+
+        return remove_listener
+
+    async def _async_subscribe_key(self, key: str) -> None:
+        """Subscribe to ``state/<key>``; the key must be marked in flight."""
+        unsubscribe = await mqtt.async_subscribe(
+            self.hass, f"{self.state_topic_base}/{key}", self._message_received
+        )
+        if self._subscriptions.get(key, unsubscribe) is not None:
+            # Dropped or subscribed again while this request was in flight
+            unsubscribe()
+            return
+        self._subscriptions[key] = unsubscribe
+
+    @callback
+    def _async_unsubscribe_key(self, key: str) -> None:
+        """Drop the subscription of a key that lost its last listener."""
+        if (unsubscribe := self._subscriptions.pop(key, None)) is not None:
+            _LOGGER.debug("Unsubscribing %s of device %s", key, self.device_id)
+            unsubscribe()
+
+    @callback
+    def _record_history(self, buffer: ReadingBuffer, value: float) -> None:
+        """Store a reading in its history buffer."""
+        buffer.append(time.time(), value)
+
+    @callback
+    def _message_received(self, message: mqtt.ReceiveMessage) -> None:
+        """Handle a message from the device subscription."""
+        self.async_dispatch(message.topic[self._key_offset:], message)
+
+    @callback
+    def async_dispatch(self, key: str, message: mqtt.ReceiveMessage) -> None:
+        """Dispatch a state message to the listeners of its key."""
+        started = time.perf_counter_ns()
+        if (stats := self.key_stats.get(key)) is None:
+            stats = self.key_stats[key] = KeyStats()
+        stats.received += 1
+        self.last_seen = now = time.monotonic()
+        if not self.available:
+            self._async_set_available(True)
+        if self.first_state_seconds is None:
+            self.first_state_seconds = round(now - self._started_at, 3)
+            _LOGGER.debug(
+                "First state of device %s after %ss",
+                self.device_id,
+                self.first_state_seconds,
+            )
+
+        if key in _CONTROL_KEYS:
+            self.control_state[key] = message.payload
+            self.commands.async_handle_echo(key, message.payload)
+        listeners = self._listeners.get(key)
+        if listeners is None:
+            return
+        try:
+            value = DECODERS.get(key, decode_raw)(message.payload)
+        except (ValueError, TypeError) as err:
+            stats.decode_failures += 1
+            _LOGGER.error(
+                "Invalid %s value from device %s: %s - %s",
+                key,
+                self.device_id,
+                message.payload,
+                err,
+            )
+            return
+        writes_before = self.writes_emitted
+        for listener in listeners:
+            listener(value)
+        stats.record(
+            time.perf_counter_ns() - started, self.writes_emitted - writes_before
+        )
+
+    @callback
+    def async_add_availability_listener(
+        self, listener: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Register a callback run when the device availability changes."""
+        self._availability_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            if listener in self._availability_listeners:
+                self._availability_listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def async_add_tick_listener(self, listener: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Register a callback run on every watchdog tick while available."""
+        self._tick_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            if listener in self._tick_listeners:
+                self._tick_listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def async_tick(self) -> None:
+        """Run the tick listeners of an available device."""
+        if not self.available:
+            return
+        for listener in self._tick_listeners:
+            listener()
+
+    @callback
+    def async_check_stale(self, now: float) -> None:
+        """Mark the device unavailable if it has been silent for too long."""
+        if self.available and now - self.last_seen > self.stale_timeout:
+            _LOGGER.info(
+                "No state from device %s for %.0fs, marking it unavailable",
+                self.device_id,
+                now - self.last_seen,
+            )
+            self._async_set_available(False)
+
+    @callback
+    def _async_set_available(self, available: bool) -> None:
+        """Change the availability and notify the entities."""
+        if available:
+            _LOGGER.info("Device %s is available again", self.device_id)
+        self.available = available
+        for listener in self._availability_listeners:
+            listener()
+
+    @property
+    def messages_received(self) -> int:
+        """Return the number of state messages received."""
+        return sum(stats.received for stats in self.key_stats.values())
+
+    def as_diagnostics(self) -> dict[str, Any]:
+        """Return runtime counters of the device."""
+        diagnostics = {
+            "available": self.available,
+            "seconds_since_last_state": round(time.monotonic() - self.last_seen, 1),
+            "listeners": self.listener_count,
+            "subscribed_keys": sorted(self._subscriptions),
+            "state_writes_emitted": self.writes_emitted,
+            "state_writes_suppressed": self.writes_suppressed,
+            "state_keys": {
+                key: stats.as_dict() for key, stats in sorted(self.key_stats.items())
+            },
+            "commands": self.commands.as_diagnostics(),
+            "startup": {
+                "restored_entities": self.restored_entities,
+                "first_state_seconds": self.first_state_seconds,
+            },
+        }
+        if self.ventilation is not None:
+            diagnostics["ventilation"] = self.ventilation.as_diagnostics()
+        return diagnostics
@@ -2,74 +2,254 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Callable
+from datetime import datetime
 import logging
-import re
-from typing import Any
+import time
+from typing import TYPE_CHECKING
 
+from homeassistant import config_entries
 from homeassistant.components import mqtt
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import discovery_flow
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN, STATE_TOPIC_FILTER
+
+if TYPE_CHECKING:
+    from .hub import BalluASP100Hub
 
 _LOGGER = logging.getLogger(__name__)
 
-async def discover_ballu_devices(hass: HomeAssistant) -> list[dict[str, str]]:
-    """Discover Ballu ASP-100 devices via MQTT with better validation."""
-    devices = {}
-    discovery_complete = asyncio.Event()
-    
-    async def message_received(msg: mqtt.ReceiveMessage) -> None:
+# State keys that identify a Ballu device
+DISCOVERY_KEYS = frozenset(
+    {"temperature", "speed", "mode", "sensor/temperature", "diag/rssi"}
+)
+# Distinct key topics after which a device is reported right away
+CONFIRMED_TOPICS = 3
+# Distinct key topics required for a device to be returned at all
+MIN_TOPICS = 2
+
+DISCOVERY_TIMEOUT = 10.0
+# Stop once no new device appeared for this long after the first one
+DISCOVERY_QUIET_PERIOD = 2.0
+# Seconds passive discovery keeps its own wildcard subscription after startup
+PASSIVE_DISCOVERY_WINDOW = 600.0
+
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+
+def parse_state_topic(topic: str) -> tuple[str, str, str] | None:
+    """Split ``rusclimate/{device_type}/{device_id}/state/{key}``."""
+    parts = topic.split("/", 4)
+    if len(parts) != 5 or parts[0] != "rusclimate" or parts[3] != "state":
+        return None
+    device_id = parts[2]
+    if len(device_id) != 32 or not _HEX_DIGITS.issuperset(device_id):
+        return None
+    return parts[1], device_id, parts[4]
+
+
+def device_info(device_type: str, device_id: str) -> dict[str, str]:
+    """Return the description of a discovered device."""
+    return {
+        "device_id": device_id,
+        "device_type": device_type,
+        "name": f"Ballu ASP-100 {device_id[-6:].upper()}",
+    }
+
+
+class DiscoveryEngine:
+    """Incrementally identify Ballu devices from a stream of state topics.
+
+    Each device is reported through ``on_device`` as soon as it reaches
+    confidence, independently of the others. Devices that are already
+    confirmed cost one topic split and one dict lookup per message.
+    """
+
+    def __init__(
+        self,
+        on_device: Callable[[dict[str, str]], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the engine."""
+        self._on_device = on_device
+        self._clock = clock
+        self._candidates: dict[tuple[str, str], set[str]] = {}
+        self._confirmed: dict[tuple[str, str], dict[str, str]] = {}
+        self.last_activity = clock()
+
+    @property
+    def confirmed(self) -> list[dict[str, str]]:
+        """Return devices that reached confidence."""
+        return list(self._confirmed.values())
+
+    def feed(self, topic: str) -> dict[str, str] | None:
+        """Process a topic and return a device once it becomes confirmed."""
+        if (parsed := parse_state_topic(topic)) is None:
+            return None
+        device_type, device_id, state_key = parsed
+        device_key = (device_type, device_id)
+        if device_key in self._confirmed or state_key not in DISCOVERY_KEYS:
+            return None
+
+        if (topics := self._candidates.get(device_key)) is None:
+            topics = self._candidates[device_key] = set()
+            self.last_activity = self._clock()
+        topics.add(state_key)
+        if len(topics) < CONFIRMED_TOPICS:
+            return None
+
+        # If we found multiple key topics, we're confident it's a Ballu device
+        del self._candidates[device_key]
+        device = self._confirmed[device_key] = device_info(device_type, device_id)
+        self.last_activity = self._clock()
+        if self._on_device is not None:
+            self._on_device(device)
+        return device
+
+    def results(self) -> list[dict[str, str]]:
+        """Return confirmed devices and candidates with enough key topics."""
+        return self.confirmed + [
+            device_info(*device_key)
+            for device_key, topics in self._candidates.items()
+            if len(topics) >= MIN_TOPICS
+        ]
+
+
+async def discover_ballu_devices(
+    hass: HomeAssistant,
+    timeout: float = DISCOVERY_TIMEOUT,
+    quiet_period: float = DISCOVERY_QUIET_PERIOD,
+    on_device: Callable[[dict[str, str]], None] | None = None,
+) -> list[dict[str, str]]:
+    """Discover Ballu ASP-100 devices via MQTT.
+
+    Returns once no new device appeared for ``quiet_period`` seconds after the
+    first confirmed one, or after ``timeout`` seconds at the latest.
+    """
+    loop = asyncio.get_running_loop()
+    activity = asyncio.Event()
+
+    @callback
+    def device_confirmed(device: dict[str, str]) -> None:
+        _LOGGER.debug("Discovered Ballu device %s", device["device_id"])
+        activity.set()
+        if on_device is not None:
+            on_device(device)
+
+    engine = DiscoveryEngine(device_confirmed, loop.time)
+
+    @callback
+    def message_received(msg: mqtt.ReceiveMessage) -> None:
         """Handle incoming MQTT messages for discovery."""
-        topic = msg.topic
-        payload = msg.payload
-        
-        # Pattern: rusclimate/{device_type}/{device_id}/state/#
-        pattern = r"rusclimate/([^/]+)/([a-f0-9]{32})/state/(.+)"
-        match = re.match(pattern, topic)
-        
-        if match:
-            device_type = match.group(1)
-            device_id = match.group(2)
-            state_key = match.group(3)
-            
-            # Only process certain state topics to confirm it's a Ballu device
-            if state_key in ["temperature", "speed", "mode", "sensor/temperature", "diag/rssi"]:
-                device_key = f"{device_type}_{device_id}"
-                
-                if device_key not in devices:
-                    devices[device_key] = {
-                        "device_id": device_id,
-                        "device_type": device_type,
-                        "name": f"Ballu ASP-100 {device_id[-6:].upper()}",
-                        "last_seen": asyncio.get_event_loop().time(),
-                        "topics_found": set()
-                    }
-                
-                devices[device_key]["topics_found"].add(state_key)
-                devices[device_key]["last_seen"] = asyncio.get_event_loop().time()
-                
-                # If we found multiple key topics, we're confident it's a Ballu device
-                if len(devices[device_key]["topics_found"]) >= 3:
-                    discovery_complete.set()
+        engine.feed(msg.topic)
 
     # Subscribe to all Ballu state topics
     subscription = await mqtt.async_subscribe(
-        hass, "rusclimate/+/+/state/#", message_received, 1
+        hass, STATE_TOPIC_FILTER, message_received, 1
     )
-    
+
+    deadline = loop.time() + timeout
     try:
-        # Wait for discovery to complete or timeout after 10 seconds
-        await asyncio.wait_for(discovery_complete.wait(), timeout=10.0)
-    except asyncio.TimeoutError:
-        _LOGGER.debug("Device discovery timeout")
+        while (remaining := deadline - loop.time()) > 0:
+            wait = remaining
+            if engine.confirmed:
+                idle = loop.time() - engine.last_activity
+                if idle >= quiet_period:
+                    break
+                wait = min(remaining, quiet_period - idle)
+            activity.clear()
+            try:
+                await asyncio.wait_for(activity.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            _LOGGER.debug("Device discovery timeout")
     finally:
         subscription()
-    
-    # Filter devices that we're confident about
-    confident_devices = []
-    for device in devices.values():
-        if len(device["topics_found"]) >= 2:  # At least 2 different state topics
-            confident_devices.append({
-                "device_id": device["device_id"],
-                "device_type": device["device_type"],
-                "name": device["name"]
-            })
-    
-    return confident_devices
\ No newline at end of file
+
+    return engine.results()
+
+
+class PassiveDiscovery:
+    """Start config flows for devices seen in normal broker traffic.
+
+    The ``rusclimate/+/+/state/#`` wildcard delivers every state message of
+    every device a second time, next to the per-device subscription of its
+    coordinator. To bound that cost the wildcard is only held for
+    ``PASSIVE_DISCOVERY_WINDOW`` seconds after startup; retained topics and
+    a few minutes of live traffic are enough to see every powered unit.
+
+    In hub mode the hub already holds the same wildcard, so discovery drops
+    its own subscription and is fed the topics of unknown devices by the hub
+    instead, at no extra delivery cost and without a time limit.
+
+    Before the first device is configured the integration is not loaded at
+    all; the ``mqtt`` entry of the manifest covers that case, with the MQTT
+    integration starting ``async_step_mqtt`` flows.
+
+    Every device is reported once per run; devices that are already
+    configured are skipped.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize passive discovery."""
+        self.hass = hass
+        self._engine = DiscoveryEngine(self._device_confirmed)
+        self._unsubscribe: CALLBACK_TYPE | None = None
+        self._cancel_window: CALLBACK_TYPE | None = None
+
+    async def async_start(self) -> None:
+        """Listen for state topics for the discovery window."""
+        self._unsubscribe = await mqtt.async_subscribe(
+            self.hass, STATE_TOPIC_FILTER, self._message_received
+        )
+
+        @callback
+        def window_closed(_now: datetime) -> None:
+            self._cancel_window = None
+            _LOGGER.debug("Passive discovery window closed")
+            self.async_stop()
+
+        self._cancel_window = async_call_later(
+            self.hass, PASSIVE_DISCOVERY_WINDOW, window_closed
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening for state topics."""
+        if self._cancel_window is not None:
+            self._cancel_window()
+            self._cancel_window = None
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    @callback
+    def async_attach_hub(self, hub: BalluASP100Hub) -> None:
+        """Take state topics of unknown devices from the hub subscription."""
+        self.async_stop()
+        hub.unrouted_listener = self._engine.feed
+
+    @callback
+    def _message_received(self, msg: mqtt.ReceiveMessage) -> None:
+        """Feed a state topic to the discovery engine."""
+        self._engine.feed(msg.topic)
+
+    @callback
+    def _device_confirmed(self, device: dict[str, str]) -> None:
+        """Start a discovery flow for an unconfigured device."""
+        configured = {
+            entry.unique_id for entry in self.hass.config_entries.async_entries(DOMAIN)
+        }
+        if f"ballu_asp100_{device['device_id']}" in configured:
+            return
+
+        _LOGGER.debug("Found unconfigured Ballu device %s", device["device_id"])
+        discovery_flow.async_create_flow(
+            self.hass,
+            DOMAIN,
+            context={"source": config_entries.SOURCE_INTEGRATION_DISCOVERY},
+            data=device,
+        )
@@ -0,0 +1,81 @@
+"""Base entity for Ballu ASP-100."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.entity import DeviceInfo, Entity
+
+from .const import DOMAIN, MANUFACTURER, MODEL
+from .coordinator import BalluASP100Coordinator, MessageCallback
+
+
+class BalluASP100Entity(Entity):
+    """Common base for entities fed by a device coordinator."""
+
+    _attr_should_poll = False
+
+    def __init__(self, coordinator: BalluASP100Coordinator) -> None:
+        """Initialize the entity."""
+        self._coordinator = coordinator
+        self._device_id = coordinator.device_id
+        self._device_type = coordinator.device_type
+        self._device_name = coordinator.name
+        self._command_topic_base = coordinator.command_topic_base
+        self._state_topic_base = coordinator.state_topic_base
+        self._removed = False
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device info."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._device_id)},
+            name=self._device_name,
+            manufacturer=MANUFACTURER,
+            model=MODEL,
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return True while the device keeps sending state."""
+        return self._coordinator.available
+
+    async def async_added_to_hass(self) -> None:
+        """Follow device availability when entity is added to hass."""
+        self.async_on_remove(
+            self._coordinator.async_add_availability_listener(
+                self.async_write_ha_state
+            )
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Mark the entity as removed for late command callbacks."""
+        self._removed = True
+
+    @callback
+    def _async_listen(self, key: str, handler: MessageCallback) -> None:
+        """Route messages of a state key to a handler while the entity lives."""
+        self.async_on_remove(self._coordinator.async_add_listener(key, handler))
+
+    @callback
+    def _rollback_to(self, **attributes: Any) -> CALLBACK_TYPE:
+        """Return a callback restoring optimistic attributes of a command."""
+
+        @callback
+        def rollback() -> None:
+            if self._removed:
+                return
+            for name, value in attributes.items():
+                setattr(self, name, value)
+            self.async_write_ha_state()
+
+        return rollback
+
+    @callback
+    def _async_write_if_changed(self, changed: bool) -> None:
+        """Write state only when a decoded value changed."""
+        if changed:
+            self._coordinator.writes_emitted += 1
+            self.async_write_ha_state()
+        else:
+            self._coordinator.writes_suppressed += 1
@@ -0,0 +1,168 @@
+"""Filter depletion model for Ballu ASP-100.
+
+The remaining filter percentage is regressed against fan runtime weighted by
+speed ("speed-hours"), so a unit running at S6 wears its filter six times
+faster than at S1. The regression is kept as running means and co-moments
+(Welford's update), so adding a sample is O(1) and the state is a handful of
+floats per device no matter how long it has been tracked.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_KEY = f"{DOMAIN}.filter_models"
+STORAGE_VERSION = 1
+# Seconds to batch model writes to disk
+SAVE_DELAY = 300
+
+# Gaps between updates longer than this are not counted as runtime
+MAX_UPDATE_GAP = 600.0
+# Rise of the filter percentage that means the filter was replaced
+REPLACEMENT_RISE = 5
+# Distinct percentages needed before a prediction is made
+MIN_SAMPLES = 3
+
+
+class FilterDepletionModel:
+    """Online linear regression of filter percentage on weighted runtime."""
+
+    __slots__ = (
+        "runtime",
+        "observed",
+        "weight",
+        "updated",
+        "last_percent",
+        "count",
+        "mean_x",
+        "mean_y",
+        "co_moment",
+        "m2_x",
+    )
+
+    def __init__(self) -> None:
+        """Initialize an empty model."""
+        # Speed-hours and wall-clock hours seen while tracking
+        self.runtime = 0.0
+        self.observed = 0.0
+        self.weight = 0.0
+        self.updated: float | None = None
+        self.last_percent: int | None = None
+        self.count = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.co_moment = 0.0
+        self.m2_x = 0.0
+
+    def reset(self) -> None:
+        """Drop the regression, e.g. after the filter was replaced."""
+        self.last_percent = None
+        self.count = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.co_moment = 0.0
+        self.m2_x = 0.0
+
+    def advance(self, now: float, weight: float | None = None) -> None:
+        """Accumulate runtime up to ``now`` and optionally change the weight."""
+        if self.updated is not None:
+            gap = now - self.updated
+            if 0 < gap <= MAX_UPDATE_GAP:
+                self.runtime += gap / 3600 * self.weight
+                self.observed += gap / 3600
+        self.updated = now
+        if weight is not None:
+            self.weight = weight
+
+    def add_sample(self, percent: int) -> bool:
+        """Add a filter reading taken at the current runtime.
+
+        Only changes of the percentage are added. Returns True if the model
+        changed.
+        """
+        if percent == self.last_percent:
+            return False
+        if self.last_percent is not None and percent >= (
+            self.last_percent + REPLACEMENT_RISE
+        ):
+            self.reset()
+        self.last_percent = percent
+        self.count += 1
+        delta_x = self.runtime - self.mean_x
+        self.mean_x += delta_x / self.count
+        self.mean_y += (percent - self.mean_y) / self.count
+        self.co_moment += delta_x * (percent - self.mean_y)
+        self.m2_x += delta_x * (self.runtime - self.mean_x)
+        return True
+
+    @property
+    def slope(self) -> float | None:
+        """Return the depletion in percent per speed-hour (negative)."""
+        if self.count < MIN_SAMPLES or self.m2_x <= 0:
+            return None
+        return self.co_moment / self.m2_x
+
+    def hours_left(self) -> float | None:
+        """Return wall-clock hours until the filter reaches 0 %."""
+        if (slope := self.slope) is None or slope >= 0 or self.observed <= 0:
+            return None
+        usage = self.runtime / self.observed
+        if usage <= 0:
+            return None
+        percent_now = self.mean_y + slope * (self.runtime - self.mean_x)
+        return max(percent_now, 0) / -slope / usage
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the model state for storage."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> FilterDepletionModel:
+        """Rebuild a model from storage."""
+        model = cls()
+        for name in cls.__slots__:
+            if name in data:
+                setattr(model, name, data[name])
+        return model
+
+
+class FilterModelStore:
+    """Depletion models of all devices, persisted in one ``Store``."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self._models: dict[str, FilterDepletionModel] = {}
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+
+    async def async_get_model(self, device_id: str) -> FilterDepletionModel:
+        """Return the model of a device, loading stored models on first use."""
+        async with self._load_lock:
+            if not self._loaded:
+                stored = await self._store.async_load() or {}
+                for stored_id, data in stored.items():
+                    self._models[stored_id] = FilterDepletionModel.from_dict(data)
+                self._loaded = True
+        if (model := self._models.get(device_id)) is None:
+            model = self._models[device_id] = FilterDepletionModel()
+        return model
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Write the models to disk after a delay."""
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        """Return the models for storage."""
+        return {
+            device_id: model.as_dict() for device_id, model in self._models.items()
+        }
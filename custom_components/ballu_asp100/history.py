@@ -0,0 +1,79 @@
+"""In-memory history of recent Ballu ASP-100 readings.
+
+Each device keeps one fixed-size ring buffer per tracked state key. A buffer
+stores ``HISTORY_CAPACITY`` readings as 4-byte floats plus 8-byte timestamps,
+i.e. 720 * 12 B = 8640 B of array data (about 8.6 KiB with object overhead),
+so a device with CO2 and temperature history holds roughly 17 KiB no matter
+how long it runs.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Any
+
+# Readings kept per state key: one hour at the usual 5 s reporting interval
+HISTORY_CAPACITY = 720
+
+# State keys with history, mapped to the service name of the sensor
+HISTORY_KEYS = {
+    "sensor/co2": "co2",
+    "sensor/temperature": "temperature",
+}
+
+
+class ReadingBuffer:
+    """Fixed-size ring buffer of timestamped readings backed by ``array``."""
+
+    __slots__ = ("_values", "_times", "_capacity", "_next", "_size")
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY) -> None:
+        """Initialize the buffer."""
+        self._values = array("f", bytes(4 * capacity))
+        self._times = array("d", bytes(8 * capacity))
+        self._capacity = capacity
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored readings."""
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Return the size of the array storage in bytes."""
+        return (
+            self._values.itemsize * len(self._values)
+            + self._times.itemsize * len(self._times)
+        )
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Store a reading, overwriting the oldest one when full."""
+        self._values[self._next] = value
+        self._times[self._next] = timestamp
+        self._next = (self._next + 1) % self._capacity
+        if self._size < self._capacity:
+            self._size += 1
+
+    def window(self, since: float) -> list[tuple[float, float]]:
+        """Return readings not older than ``since``, oldest first."""
+        start = (self._next - self._size) % self._capacity
+        readings = []
+        for offset in range(self._size):
+            index = (start + offset) % self._capacity
+            if (timestamp := self._times[index]) >= since:
+                readings.append((timestamp, self._values[index]))
+        return readings
+
+    def summary(self, since: float) -> dict[str, Any]:
+        """Return statistics of the readings not older than ``since``."""
+        values = [value for _, value in self.window(since)]
+        if not values:
+            return {"count": 0}
+        return {
+            "count": len(values),
+            "min": round(min(values), 2),
+            "max": round(max(values), 2),
+            "mean": round(sum(values) / len(values), 2),
+            "first": round(values[0], 2),
+            "last": round(values[-1], 2),
+        }
@@ -0,0 +1,85 @@
+"""Fleet hub for Ballu ASP-100 state messages."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components import mqtt
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import STATE_TOPIC_FILTER
+
+if TYPE_CHECKING:
+    from .coordinator import BalluASP100Coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class BalluASP100Hub:
+    """Route broker-wide state messages to device coordinators.
+
+    Holds one ``rusclimate/+/+/state/#`` subscription for every device that
+    runs in hub mode and indexes coordinators by ``(device_type, device_id)``,
+    so routing a message costs one ``split`` and one dict lookup regardless of
+    fleet size. Topics of devices that are not registered go to
+    ``unrouted_listener``, which passive discovery uses instead of holding
+    its own wildcard; the subscription is kept while a listener is attached,
+    even when the last device unregisters during a reload.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self._devices: dict[tuple[str, str], BalluASP100Coordinator] = {}
+        self._unsubscribe: CALLBACK_TYPE | None = None
+        self._lock = asyncio.Lock()
+        self.unrouted_listener: Callable[[str], Any] | None = None
+
+    async def async_register(
+        self, coordinator: BalluASP100Coordinator
+    ) -> CALLBACK_TYPE:
+        """Add a device to the routing index and return its remover."""
+        index_key = (coordinator.device_type, coordinator.device_id)
+        self._devices[index_key] = coordinator
+        await self._async_subscribe()
+
+        @callback
+        def unregister() -> None:
+            if self._devices.get(index_key) is coordinator:
+                del self._devices[index_key]
+            # Discovery still needs the topics of unknown devices
+            if not self._devices and self.unrouted_listener is None:
+                self.async_stop()
+
+        return unregister
+
+    @callback
+    def async_stop(self) -> None:
+        """Drop the fleet-wide subscription."""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    async def _async_subscribe(self) -> None:
+        """Hold the fleet-wide subscription."""
+        async with self._lock:
+            if self._unsubscribe is None:
+                _LOGGER.debug("Setting up fleet-wide MQTT subscription")
+                self._unsubscribe = await mqtt.async_subscribe(
+                    self.hass, STATE_TOPIC_FILTER, self._message_received
+                )
+
+    @callback
+    def _message_received(self, message: mqtt.ReceiveMessage) -> None:
+        """Route a state message to the coordinator of its device."""
+        # rusclimate/{device_type}/{device_id}/state/{key}
+        parts = message.topic.split("/", 4)
+        if len(parts) != 5:
+            return
+        coordinator = self._devices.get((parts[1], parts[2]))
+        if coordinator is not None:
+            coordinator.async_dispatch(parts[4], message)
+        elif self.unrouted_listener is not None:
+            self.unrouted_listener(message.topic)
@@ -1,11 +1,11 @@
 """Services for Ballu ASP-100 manual discovery."""
+from __future__ import annotations
+
 import logging
 
 import voluptuous as vol
 
-from homeassistant.components import mqtt
-from homeassistant.core import ServiceCall
-import homeassistant.helpers.config_validation as cv
+from homeassistant.core import HomeAssistant, ServiceCall
 
 from .const import DOMAIN
 
@@ -19,7 +19,8 @@ async def async_setup_services(hass: HomeAssistant) -> None:
     
     async def async_handle_discover(call: ServiceCall) -> None:
         """Handle discover devices service call."""
-        from .config_flow import discover_ballu_devices
+        # The scanner is only needed when the service is actually called
+        from .discovery import discover_ballu_devices
         
         devices = await discover_ballu_devices(hass)
         
@@ -47,4 +48,4 @@ async def async_setup_services(hass: HomeAssistant) -> None:
 
 async def async_unload_services(hass: HomeAssistant) -> None:
     """Unload Ballu ASP-100 services."""
-    hass.services.async_remove(DOMAIN, SERVICE_DISCOVER_DEVICES)
\ No newline at end of file
+    hass.services.async_remove(DOMAIN, SERVICE_DISCOVER_DEVICES)
@@ -6,11 +6,14 @@ from typing import Any
 
 from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.components import mqtt
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
 
+from .codec import SOUND_BY_VALUE, encode_sound
 from .const import DOMAIN, SOUND_MAPPING
+from .coordinator import BalluASP100Coordinator
+from .entity import BalluASP100Entity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,55 +23,31 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Ballu ASP-100 select from config entry."""
-    data = config_entry.data
+    coordinator: BalluASP100Coordinator = hass.data[DOMAIN][config_entry.entry_id]
     
-    select_entity = BalluASP100Select(
-        hass,
-        data["device_id"],
-        data["device_type"],
-        data["name"],
-        config_entry.entry_id,
-    )
+    select_entity = BalluASP100Select(coordinator, config_entry.entry_id)
     
     async_add_entities([select_entity])
 
-class BalluASP100Select(SelectEntity):
+class BalluASP100Select(BalluASP100Entity, SelectEntity, RestoreEntity):
     """Representation of Ballu ASP-100 sounds select."""
 
     def __init__(
         self,
-        hass: HomeAssistant,
-        device_id: str,
-        device_type: str,
-        device_name: str,
+        coordinator: BalluASP100Coordinator,
         entry_id: str,
     ) -> None:
         """Initialize the select."""
-        self.hass = hass
-        self._device_id = device_id
-        self._device_type = device_type
-        self._device_name = device_name
+        super().__init__(coordinator)
         self._entry_id = entry_id
         
         self._attr_name = "Sounds"
-        self._attr_unique_id = f"ballu_asp100_{device_id}_sounds"
+        self._attr_unique_id = f"ballu_asp100_{coordinator.device_id}_sounds"
         self._attr_icon = "mdi:music"
         self._attr_options = list(SOUND_MAPPING.keys())
         self._attr_entity_registry_enabled_default = False
         
         self._current_option = "Выключено"
-        self._command_topic_base = f"rusclimate/{device_type}/{device_id}/control"
-        self._state_topic_base = f"rusclimate/{device_type}/{device_id}/state"
-
-    @property
-    def device_info(self):
-        """Return device info."""
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": self._device_name,
-            "manufacturer": "Ballu",
-            "model": "ONEAIR ASP-100",
-        }
 
     @property
     def current_option(self) -> str:
@@ -77,37 +56,28 @@ class BalluASP100Select(SelectEntity):
 
     async def async_select_option(self, option: str) -> None:
         """Change the selected option."""
-        topic = f"{self._command_topic_base}/amount"
-        sound_value = SOUND_MAPPING.get(option, 0)
-        
-        await mqtt.async_publish(
-            self.hass,
-            topic,
-            str(sound_value),
-            qos=1,
-            retain=False,
+        await self._coordinator.commands.async_publish(
+            "amount",
+            encode_sound(option),
+            self._rollback_to(_current_option=self._current_option),
         )
         self._current_option = option
         self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
-        """Subscribe to MQTT topics when entity is added to hass."""
-        topic = f"{self._state_topic_base}/amount"
-        
-        await mqtt.async_subscribe(
-            self.hass,
-            topic,
-            self._message_received,
-        )
+        """Register for the sound state key when entity is added to hass."""
+        await super().async_added_to_hass()
+        last_state = await self.async_get_last_state()
+        if last_state is not None and last_state.state in self._attr_options:
+            self._current_option = last_state.state
+            self._coordinator.restored_entities += 1
+        self._async_listen("amount", self._message_received)
 
-    def _message_received(self, message):
-        """Handle new MQTT messages."""
-        try:
-            sound_value = int(message.payload)
-            for option, value in SOUND_MAPPING.items():
-                if value == sound_value:
-                    self._current_option = option
-                    break
-            self.async_write_ha_state()
-        except (ValueError, KeyError) as err:
-            _LOGGER.error("Error processing message for %s: %s", self.name, err)
\ No newline at end of file
+    @callback
+    def _message_received(self, sound_value: int) -> None:
+        """Handle a decoded sound state."""
+        if (option := SOUND_BY_VALUE.get(sound_value)) is None:
+            return
+        changed = option != self._current_option
+        self._current_option = option
+        self._async_write_if_changed(changed)
\ No newline at end of file
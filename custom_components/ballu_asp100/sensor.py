@@ -1,20 +1,40 @@
 """Sensor platform for Ballu ASP-100."""
 from __future__ import annotations
 
+from datetime import datetime, timedelta
 import logging
+import time
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    RestoreSensor,
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.components import mqtt
-from homeassistant.const import UnitOfTemperature, SIGNAL_STRENGTH_DECIBELS_MILLIWATT
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    EntityCategory,
+    UnitOfTemperature,
+    SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+)
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .const import CONF_SENSOR_INTERVAL, DOMAIN, MODE_MAPPING
+from .coordinator import BalluASP100Coordinator
+from .entity import BalluASP100Entity
+from .filter_model import FilterDepletionModel, FilterModelStore
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds the device countdown may disagree with the boost end before resync
+BOOST_DRIFT_TOLERANCE = 3
+# Slack for float error: 21.5 - 21.3 is 0.1999... and must still count as 0.2
+SIGNIFICANT_CHANGE_TOLERANCE = 1e-9
+
 SENSOR_TYPES = {
     "co2": {
         "name": "CO2",
@@ -22,6 +42,9 @@ SENSOR_TYPES = {
         "unit": "ppm",
         "icon": "mdi:molecule-co2",
         "enabled_default": False,
+        "device_class": SensorDeviceClass.CO2,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "significant_change": 20,  # Меньшие изменения не записываются
     },
     "filter_life": {
         "name": "Filter Remaining Life",
@@ -29,6 +52,9 @@ SENSOR_TYPES = {
         "unit": "%",
         "icon": "mdi:air-filter",
         "enabled_default": True,
+        "device_class": None,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "significant_change": 1,
     },
     "fan_speed": {
         "name": "Fan Speed",
@@ -36,6 +62,8 @@ SENSOR_TYPES = {
         "unit": "x",
         "icon": "mdi:fan",
         "enabled_default": False,
+        "device_class": None,
+        "state_class": SensorStateClass.MEASUREMENT,
     },
     "temperature": {
         "name": "Air Temperature",
@@ -43,6 +71,9 @@ SENSOR_TYPES = {
         "unit": UnitOfTemperature.CELSIUS,
         "icon": "mdi:thermometer",
         "enabled_default": False,
+        "device_class": SensorDeviceClass.TEMPERATURE,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "significant_change": 0.2,
     },
     "rssi": {
         "name": "RSSI",
@@ -50,6 +81,10 @@ SENSOR_TYPES = {
         "unit": SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
         "icon": "mdi:wifi",
         "enabled_default": False,
+        "device_class": SensorDeviceClass.SIGNAL_STRENGTH,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "significant_change": 3,
+        "min_interval": 60,  # Публикация агрегата не чаще раза в минуту
     },
     "mqtt_latency": {
         "name": "MQTT Latency", 
@@ -57,6 +92,10 @@ SENSOR_TYPES = {
         "unit": "ms",
         "icon": "mdi:speedometer",
         "enabled_default": False,
+        "device_class": SensorDeviceClass.DURATION,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "significant_change": 5,
+        "min_interval": 60,  # Публикация агрегата не чаще раза в минуту
     },
     "gw_latency": {
         "name": "Gateway Latency",
@@ -64,6 +103,10 @@ SENSOR_TYPES = {
         "unit": "ms",
         "icon": "mdi:router-wireless",
         "enabled_default": False,
+        "device_class": SensorDeviceClass.DURATION,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "significant_change": 5,
+        "min_interval": 60,  # Публикация агрегата не чаще раза в минуту
     },
     "gw_loss": {
         "name": "Gateway Loss",
@@ -71,121 +114,458 @@ SENSOR_TYPES = {
         "unit": "%",
         "icon": "mdi:connection",
         "enabled_default": False,
+        "device_class": None,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "min_interval": 60,  # Публикация агрегата не чаще раза в минуту
     },
     "turbo_timer": {
         "name": "Turbo Mode Timer",
         "key": "time",
-        "unit": None,  # Форматированное время MM:SS
+        "unit": None,  # Время окончания турбо режима
         "icon": "mdi:timer",
         "enabled_default": False,
+        "device_class": SensorDeviceClass.TIMESTAMP,
+        "state_class": None,
+        "boost_end": True,
     }
 }
 
+# Runtime counters of the integration itself, polled only while enabled
+STATS_SENSOR_TYPES = {
+    "messages_received": {
+        "name": "Messages Received",
+        "unit": None,
+        "icon": "mdi:message-processing",
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "value": lambda coordinator: coordinator.messages_received,
+    },
+    "handler_time_p99": {
+        "name": "Handler Time p99",
+        "unit": "µs",
+        "icon": "mdi:timer-outline",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "value": lambda coordinator: max(
+            (
+                p99
+                for stats in coordinator.key_stats.values()
+                if (p99 := stats.p99_ns) is not None
+            ),
+            default=None,
+        ),
+    },
+}
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Ballu ASP-100 sensors from config entry."""
-    data = config_entry.data
+    coordinator: BalluASP100Coordinator = hass.data[DOMAIN][config_entry.entry_id]
     
     sensors = []
     for sensor_key, sensor_config in SENSOR_TYPES.items():
+        min_interval = config_entry.options.get(
+            CONF_SENSOR_INTERVAL.format(sensor_key),
+            sensor_config.get("min_interval", 0),
+        )
+        if min_interval:
+            sensors.append(
+                BalluASP100WindowedSensor(
+                    coordinator,
+                    sensor_key,
+                    sensor_config,
+                    config_entry.entry_id,
+                    min_interval,
+                )
+            )
+            continue
+        if sensor_config.get("boost_end"):
+            sensors.append(
+                BalluASP100BoostEndSensor(
+                    coordinator,
+                    sensor_key,
+                    sensor_config,
+                    config_entry.entry_id,
+                )
+            )
+            continue
+
         sensors.append(
             BalluASP100Sensor(
-                hass,
-                data["device_id"],
-                data["device_type"],
-                data["name"],
+                coordinator,
                 sensor_key,
                 sensor_config,
                 config_entry.entry_id,
             )
         )
     
+    sensors.append(BalluASP100FilterReplacementSensor(coordinator))
+    sensors.append(BalluASP100CommandLatencySensor(coordinator))
+    sensors.extend(
+        BalluASP100StatsSensor(coordinator, stats_key, stats_config)
+        for stats_key, stats_config in STATS_SENSOR_TYPES.items()
+    )
+    
     async_add_entities(sensors)
 
-class BalluASP100Sensor(SensorEntity):
+class BalluASP100Sensor(BalluASP100Entity, RestoreSensor):
     """Representation of a Ballu ASP-100 sensor."""
 
     def __init__(
         self,
-        hass: HomeAssistant,
-        device_id: str,
-        device_type: str,
-        device_name: str,
+        coordinator: BalluASP100Coordinator,
         sensor_key: str,
         sensor_config: dict,
         entry_id: str,
     ) -> None:
         """Initialize the sensor."""
-        self.hass = hass
-        self._device_id = device_id
-        self._device_type = device_type
-        self._device_name = device_name
+        super().__init__(coordinator)
         self._sensor_key = sensor_key
         self._sensor_config = sensor_config
         self._entry_id = entry_id
         
         self._attr_name = f"{sensor_config['name']}"
-        self._attr_unique_id = f"ballu_asp100_{device_id}_{sensor_key}"
+        self._attr_unique_id = f"ballu_asp100_{coordinator.device_id}_{sensor_key}"
         self._attr_icon = sensor_config["icon"]
         self._attr_native_unit_of_measurement = sensor_config["unit"]
         self._attr_entity_registry_enabled_default = sensor_config["enabled_default"]
+        self._attr_device_class = sensor_config["device_class"]
+        self._attr_state_class = sensor_config["state_class"]
         
         self._state = None
-        self._state_topic_base = f"rusclimate/{device_type}/{device_id}/state"
+        # Smaller changes are not written, so the recorder does not keep them
+        self._significant_change = sensor_config.get("significant_change")
 
     @property
-    def device_info(self):
-        """Return device info."""
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": self._device_name,
-            "manufacturer": "Ballu",
-            "model": "ONEAIR ASP-100",
+    def native_value(self):
+        """Return the state of the sensor."""
+        return self._state
+
+    async def async_added_to_hass(self) -> None:
+        """Register for the sensor state key when entity is added to hass."""
+        await super().async_added_to_hass()
+        # Measurements are restored; the boost end is resent every second
+        if self._attr_state_class is not None:
+            last_data = await self.async_get_last_sensor_data()
+            if last_data is not None and last_data.native_value is not None:
+                self._state = last_data.native_value
+                self._coordinator.restored_entities += 1
+        self._async_listen(self._sensor_config["key"], self._message_received)
+
+    @callback
+    def _message_received(self, state: Any) -> None:
+        """Handle a decoded state value."""
+        if self._significant_change is not None and self._state is not None:
+            delta = abs(state - self._state)
+            if delta < self._significant_change - SIGNIFICANT_CHANGE_TOLERANCE:
+                self._async_write_if_changed(False)
+                return
+        changed = state != self._state
+        self._state = state
+        self._async_write_if_changed(changed)
+
+
+class BalluASP100WindowedSensor(BalluASP100Sensor):
+    """Sensor that publishes a windowed aggregate of a high-rate value.
+
+    Values received within ``min_interval`` seconds are folded into a running
+    min/max/mean and published once at the end of the window. A mean that
+    differs from the published one by less than ``significant_change`` is
+    not written, like a single value of the plain sensor.
+    """
+
+    def __init__(
+        self,
+        coordinator: BalluASP100Coordinator,
+        sensor_key: str,
+        sensor_config: dict,
+        entry_id: str,
+        min_interval: float,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, sensor_key, sensor_config, entry_id)
+        self._min_interval = min_interval
+        self._window_min: float | None = None
+        self._window_max: float | None = None
+        self._window_sum = 0.0
+        self._window_count = 0
+        self._attr_extra_state_attributes = {}
+        self._flush_unsub = None
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel the pending window flush."""
+        await super().async_will_remove_from_hass()
+        if self._flush_unsub is not None:
+            self._flush_unsub()
+            self._flush_unsub = None
+
+    @callback
+    def _message_received(self, state: Any) -> None:
+        """Fold a decoded value into the current window."""
+        value = float(state)
+        if self._window_count == 0:
+            self._window_min = self._window_max = value
+        else:
+            self._window_min = min(self._window_min, value)
+            self._window_max = max(self._window_max, value)
+        self._window_sum += value
+        self._window_count += 1
+
+        if self._state is None:
+            # Publish the first value right away instead of staying unknown
+            self._async_flush_window()
+        elif self._flush_unsub is None:
+            self._flush_unsub = async_call_later(
+                self.hass, self._min_interval, self._async_flush_window
+            )
+
+    @callback
+    def _async_flush_window(self, _now: datetime | None = None) -> None:
+        """Publish the aggregate of the current window."""
+        self._flush_unsub = None
+        if self._window_count == 0:
+            return
+
+        state = round(self._window_sum / self._window_count, 1)
+        attributes = {
+            "min": self._window_min,
+            "max": self._window_max,
+            "samples": self._window_count,
         }
+        self._window_sum = 0.0
+        self._window_count = 0
+
+        if self._significant_change is not None and self._state is not None:
+            delta = abs(state - self._state)
+            if delta < self._significant_change - SIGNIFICANT_CHANGE_TOLERANCE:
+                self._async_write_if_changed(False)
+                return
+        changed = (
+            state != self._state or attributes != self._attr_extra_state_attributes
+        )
+        self._state = state
+        self._attr_extra_state_attributes = attributes
+        self._async_write_if_changed(changed)
+
+
+class BalluASP100BoostEndSensor(BalluASP100Sensor):
+    """Time the running boost ends, derived from the device countdown.
+
+    The per-second ``time`` messages are only sync points: the end time is
+    kept while the countdown agrees with it within
+    ``BOOST_DRIFT_TOLERANCE`` seconds, so a boost costs a couple of state
+    writes instead of one per second.
+    """
+
+    async def async_added_to_hass(self) -> None:
+        """Register for the countdown and the mode."""
+        await super().async_added_to_hass()
+        self._async_listen("mode", self._mode_received)
+
+    @callback
+    def _message_received(self, remaining: int) -> None:
+        """Resync the boost end if the countdown drifted from it."""
+        if remaining <= 0:
+            self._async_set_end(None)
+            return
+        end = dt_util.utcnow().replace(microsecond=0) + timedelta(seconds=remaining)
+        if (
+            self._state is not None
+            and abs((end - self._state).total_seconds()) <= BOOST_DRIFT_TOLERANCE
+        ):
+            self._async_write_if_changed(False)
+            return
+        self._async_set_end(end)
+
+    @callback
+    def _mode_received(self, mode: int) -> None:
+        """Clear the boost end when the unit leaves boost."""
+        if mode != MODE_MAPPING["boost"]:
+            self._async_set_end(None)
+
+    @callback
+    def _async_set_end(self, end: datetime | None) -> None:
+        """Store a new boost end."""
+        changed = end != self._state
+        self._state = end
+        self._async_write_if_changed(changed)
+
+
+class BalluASP100FilterReplacementSensor(BalluASP100Entity, SensorEntity):
+    """Predicted date the filter runs out, from its depletion rate.
+
+    Wear is modelled against fan runtime weighted by speed, so the date
+    follows how hard the unit is actually run. Runtime is accrued on every
+    watchdog tick, as a unit in steady state sends no mode or speed changes.
+    """
+
+    _attr_name = "Filter Replacement"
+    _attr_icon = "mdi:air-filter"
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+
+    def __init__(self, coordinator: BalluASP100Coordinator) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = (
+            f"ballu_asp100_{coordinator.device_id}_filter_replacement"
+        )
+        self._model: FilterDepletionModel | None = None
+        self._models: FilterModelStore | None = None
+        self._mode: int | None = None
+        self._speed = 0
+        self._state: datetime | None = None
 
     @property
-    def native_value(self):
-        """Return the state of the sensor."""
+    def native_value(self) -> datetime | None:
+        """Return the predicted replacement date."""
         return self._state
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the depletion rate and model size."""
+        if self._model is None:
+            return {}
+        slope = self._model.slope
+        usage = (
+            self._model.runtime / self._model.observed
+            if self._model.observed
+            else 0
+        )
+        return {
+            "depletion_per_day": (
+                round(-slope * usage * 24, 3) if slope is not None else None
+            ),
+            "samples": self._model.count,
+        }
+
     async def async_added_to_hass(self) -> None:
-        """Subscribe to MQTT topics when entity is added to hass."""
-        topic = f"{self._state_topic_base}/{self._sensor_config['key']}"
-        
-        await mqtt.async_subscribe(
-            self.hass,
-            topic,
-            self._message_received,
+        """Load the stored model and follow filter and fan state."""
+        await super().async_added_to_hass()
+        domain_data = self.hass.data[DOMAIN]
+        if (models := domain_data.get("filter_models")) is None:
+            models = domain_data["filter_models"] = FilterModelStore(self.hass)
+        self._models = models
+        self._model = await models.async_get_model(self._device_id)
+        self._state = self._predict()
+
+        self._async_listen("mode", self._mode_received)
+        self._async_listen("speed", self._speed_received)
+        self._async_listen("expendables", self._filter_received)
+        self.async_on_remove(self._coordinator.async_add_tick_listener(self._tick))
+
+    @callback
+    def _tick(self) -> None:
+        """Accrue runtime at the current fan state."""
+        self._model.advance(time.time())
+
+    @callback
+    def _mode_received(self, mode: int) -> None:
+        """Stop counting runtime while the unit is off."""
+        self._mode = mode
+        self._model.advance(time.time(), self._weight())
+
+    @callback
+    def _speed_received(self, speed: int) -> None:
+        """Weight further runtime by the new fan speed."""
+        self._speed = speed
+        self._model.advance(time.time(), self._weight())
+
+    @callback
+    def _filter_received(self, percent: int) -> None:
+        """Add a filter reading and update the prediction."""
+        self._model.advance(time.time())
+        if not self._model.add_sample(percent):
+            return
+        self._models.async_schedule_save()
+        self._state = self._predict()
+        # The sample count attribute changes with every new sample
+        self._async_write_if_changed(True)
+
+    def _weight(self) -> float:
+        """Return the runtime weight of the current fan state."""
+        return 0.0 if self._mode == 0 else float(self._speed)
+
+    def _predict(self) -> datetime | None:
+        """Return the predicted replacement date, rounded to the hour."""
+        if (hours_left := self._model.hours_left()) is None:
+            return None
+        # Rounded so small slope changes do not produce new states
+        timestamp = round((time.time() + hours_left * 3600) / 3600) * 3600
+        return dt_util.utc_from_timestamp(timestamp)
+
+
+class BalluASP100CommandLatencySensor(BalluASP100Entity, SensorEntity):
+    """Round-trip latency from a command publish to its state echo."""
+
+    _attr_name = "Command Latency"
+    _attr_icon = "mdi:timer-sync-outline"
+    _attr_native_unit_of_measurement = "ms"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator: BalluASP100Coordinator) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"ballu_asp100_{coordinator.device_id}_command_latency"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the mean command latency."""
+        mean = self._coordinator.commands.latency.mean
+        return round(mean) if mean is not None else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the latency histogram and command outcome counters."""
+        commands = self._coordinator.commands
+        return {
+            "last": commands.latency.last,
+            "samples": commands.latency.count,
+            "histogram": commands.latency.as_dict(),
+            "confirmed": commands.confirmed,
+            "retried": commands.retried,
+            "rolled_back": commands.rolled_back,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Follow new latency samples when entity is added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._coordinator.commands.async_add_latency_listener(
+                self.async_write_ha_state
+            )
         )
 
-    def _message_received(self, message):
-        """Handle new MQTT messages."""
-        try:
-            value = message.payload
-            
-            # Special handling for different sensor types
-            if self._sensor_key == "filter_life":
-                # Фильтр приходит как [85] - убираем скобки
-                value = value.strip("[]")
-            elif self._sensor_key == "turbo_timer":
-                # Таймер форматируется как MM:SS
-                from datetime import datetime
-                seconds = int(value)
-                minutes = seconds // 60
-                remaining_seconds = seconds % 60
-                value = f"{minutes:02d}:{remaining_seconds:02d}"
-                
-            # Convert to appropriate type
-            if self._sensor_config["unit"] in ["ppm", "ms", "%", "x"]:
-                self._state = int(float(value))
-            elif self._sensor_config["unit"] == UnitOfTemperature.CELSIUS:
-                self._state = float(value)
-            else:
-                self._state = value
-                
-            self.async_write_ha_state()
-        except (ValueError, TypeError) as err:
-            _LOGGER.error("Error processing message for %s: %s", self.name, err)
\ No newline at end of file
+
+class BalluASP100StatsSensor(BalluASP100Entity, SensorEntity):
+    """Runtime counter of the device coordinator."""
+
+    _attr_should_poll = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: BalluASP100Coordinator,
+        stats_key: str,
+        stats_config: dict,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._stats_config = stats_config
+        self._attr_name = stats_config["name"]
+        self._attr_unique_id = f"ballu_asp100_{coordinator.device_id}_{stats_key}"
+        self._attr_icon = stats_config["icon"]
+        self._attr_native_unit_of_measurement = stats_config["unit"]
+        self._attr_state_class = stats_config["state_class"]
+
+    @property
+    def native_value(self) -> int | float | None:
+        """Return the current counter value."""
+        value = self._stats_config["value"](self._coordinator)
+        if value is not None and self._stats_config["unit"] == "µs":
+            return round(value / 1e3, 1)
+        return value
@@ -0,0 +1,318 @@
+"""Services for Ballu ASP-100."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+import time
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers import device_registry as dr
+
+from .codec import (
+    encode_fan_mode,
+    encode_preset,
+    encode_sound,
+    encode_switch,
+    encode_temperature,
+)
+from .const import DOMAIN, FAN_MODE_MAPPING, PRESET_MODES, SOUND_MAPPING
+from .coordinator import BalluASP100Coordinator
+from .history import HISTORY_KEYS
+
+if TYPE_CHECKING:
+    from .snapshots import BalluASP100Snapshots
+
+SERVICE_GET_HISTORY = "get_history"
+SERVICE_BULK_COMMAND = "bulk_command"
+SERVICE_SNAPSHOT_STATE = "snapshot_state"
+SERVICE_RESTORE_STATE = "restore_state"
+
+ATTR_DEVICE_ID = "device_id"
+ATTR_WINDOW = "window"
+ATTR_SENSORS = "sensors"
+ATTR_READINGS = "readings"
+ATTR_PRESET_MODE = "preset_mode"
+ATTR_FAN_MODE = "fan_mode"
+ATTR_TEMPERATURE = "temperature"
+ATTR_SOUND = "sound"
+ATTR_BUTTON_VOLUME = "button_volume"
+ATTR_BACKLIGHT = "backlight"
+ATTR_CONCURRENCY = "concurrency"
+ATTR_NAME = "name"
+ATTR_PERSIST = "persist"
+
+DEFAULT_SNAPSHOT_NAME = "default"
+
+# Devices commanded at the same time by one bulk call
+DEFAULT_BULK_CONCURRENCY = 20
+
+# Service field -> (control key, encoder), in publish order
+BULK_COMMANDS = {
+    ATTR_PRESET_MODE: ("mode", encode_preset),
+    ATTR_FAN_MODE: ("speed", encode_fan_mode),
+    ATTR_TEMPERATURE: ("temperature", encode_temperature),
+    ATTR_SOUND: ("amount", encode_sound),
+    ATTR_BUTTON_VOLUME: ("volume", encode_switch),
+    ATTR_BACKLIGHT: ("backlight", encode_switch),
+}
+
+GET_HISTORY_SCHEMA = vol.Schema({
+    vol.Required(ATTR_DEVICE_ID): cv.string,
+    vol.Optional(ATTR_WINDOW, default=timedelta(hours=1)): cv.positive_time_period,
+    vol.Optional(ATTR_SENSORS, default=list(HISTORY_KEYS.values())): vol.All(
+        cv.ensure_list, [vol.In(list(HISTORY_KEYS.values()))]
+    ),
+    vol.Optional(ATTR_READINGS, default=True): cv.boolean,
+})
+
+BULK_COMMAND_SCHEMA = vol.All(
+    vol.Schema({
+        vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_PRESET_MODE): vol.In(["off", *PRESET_MODES]),
+        vol.Optional(ATTR_FAN_MODE): vol.In(list(FAN_MODE_MAPPING)),
+        vol.Optional(ATTR_TEMPERATURE): vol.All(
+            vol.Coerce(int), vol.Range(min=5, max=25)
+        ),
+        vol.Optional(ATTR_SOUND): vol.In(list(SOUND_MAPPING)),
+        vol.Optional(ATTR_BUTTON_VOLUME): cv.boolean,
+        vol.Optional(ATTR_BACKLIGHT): cv.boolean,
+        vol.Optional(ATTR_CONCURRENCY, default=DEFAULT_BULK_CONCURRENCY): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+    }),
+    cv.has_at_least_one_key(*BULK_COMMANDS),
+)
+
+SNAPSHOT_STATE_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_NAME, default=DEFAULT_SNAPSHOT_NAME): cv.string,
+    vol.Optional(ATTR_PERSIST, default=False): cv.boolean,
+})
+
+RESTORE_STATE_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_NAME, default=DEFAULT_SNAPSHOT_NAME): cv.string,
+    vol.Optional(ATTR_CONCURRENCY, default=DEFAULT_BULK_CONCURRENCY): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=100)
+    ),
+})
+
+
+def async_get_coordinator(hass: HomeAssistant, device_id: str) -> BalluASP100Coordinator:
+    """Return the coordinator of a device registry entry."""
+    if (device := dr.async_get(hass).async_get(device_id)) is None:
+        raise HomeAssistantError(f"Unknown device: {device_id}")
+    ballu_ids = {
+        identifier for domain, identifier in device.identifiers if domain == DOMAIN
+    }
+    for coordinator in async_get_coordinators(hass):
+        if coordinator.device_id in ballu_ids:
+            return coordinator
+    raise HomeAssistantError(f"Device {device_id} is not a loaded Ballu ASP-100")
+
+
+def async_get_targets(
+    hass: HomeAssistant, device_ids: list[str] | None
+) -> dict[str, BalluASP100Coordinator | HomeAssistantError]:
+    """Resolve device registry ids to coordinators, all loaded ones if None.
+
+    Ids that do not resolve map to the error instead of raising, so one bad
+    target does not fail a fleet-wide call.
+    """
+    if device_ids is None:
+        device_registry = dr.async_get(hass)
+        targets: dict[str, BalluASP100Coordinator | HomeAssistantError] = {}
+        for coordinator in async_get_coordinators(hass):
+            device = device_registry.async_get_device(
+                identifiers={(DOMAIN, coordinator.device_id)}
+            )
+            targets[device.id if device else coordinator.device_id] = coordinator
+        return targets
+
+    targets = {}
+    for device_id in device_ids:
+        try:
+            targets[device_id] = async_get_coordinator(hass, device_id)
+        except HomeAssistantError as err:
+            targets[device_id] = err
+    return targets
+
+
+async def _async_fan_out(
+    targets: dict[str, BalluASP100Coordinator | HomeAssistantError],
+    action: Callable[[BalluASP100Coordinator], Awaitable[dict[str, Any]]],
+    concurrency: int,
+) -> dict[str, Any]:
+    """Run an action for every target device, ``concurrency`` at a time.
+
+    Returns success counts and the result of every device; failures are
+    reported per device instead of failing the call.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def async_run(coordinator: BalluASP100Coordinator) -> dict[str, Any]:
+        async with semaphore:
+            try:
+                return {"success": True, **await action(coordinator)}
+            except HomeAssistantError as err:
+                return {"success": False, "error": str(err)}
+
+    results: dict[str, dict[str, Any]] = {
+        device_id: {"success": False, "error": str(target)}
+        for device_id, target in targets.items()
+        if isinstance(target, HomeAssistantError)
+    }
+    pending = {
+        device_id: target
+        for device_id, target in targets.items()
+        if not isinstance(target, HomeAssistantError)
+    }
+    outcomes = await asyncio.gather(
+        *(async_run(coordinator) for coordinator in pending.values())
+    )
+    results.update(zip(pending, outcomes))
+
+    succeeded = sum(1 for result in results.values() if result["success"])
+    return {
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "devices": results,
+    }
+
+
+def async_get_coordinators(hass: HomeAssistant) -> list[BalluASP100Coordinator]:
+    """Return the coordinators of all loaded config entries."""
+    return [
+        value
+        for value in hass.data.get(DOMAIN, {}).values()
+        if isinstance(value, BalluASP100Coordinator)
+    ]
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Set up services for Ballu ASP-100."""
+
+    def async_get_snapshots() -> BalluASP100Snapshots:
+        """Return the snapshot store, created on first use."""
+        from .snapshots import BalluASP100Snapshots
+
+        if (snapshots := hass.data[DOMAIN].get("snapshots")) is None:
+            snapshots = hass.data[DOMAIN]["snapshots"] = BalluASP100Snapshots(hass)
+        return snapshots
+
+    async def async_handle_get_history(call: ServiceCall) -> ServiceResponse:
+        """Return recent readings of a device from memory."""
+        coordinator = async_get_coordinator(hass, call.data[ATTR_DEVICE_ID])
+        since = time.time() - call.data[ATTR_WINDOW].total_seconds()
+        response = {}
+        for key, name in HISTORY_KEYS.items():
+            if name not in call.data[ATTR_SENSORS]:
+                continue
+            buffer = coordinator.history[key]
+            result = {"summary": buffer.summary(since)}
+            if call.data[ATTR_READINGS]:
+                result["readings"] = [
+                    [round(timestamp, 1), round(value, 2)]
+                    for timestamp, value in buffer.window(since)
+                ]
+            response[name] = result
+        return response
+
+    async def async_handle_bulk_command(call: ServiceCall) -> ServiceResponse:
+        """Send the same commands to many devices with bounded fan-out."""
+        # Encoded once for the whole fleet
+        commands = [
+            (key, encoder(call.data[field]))
+            for field, (key, encoder) in BULK_COMMANDS.items()
+            if field in call.data
+        ]
+
+        async def async_command_device(
+            coordinator: BalluASP100Coordinator,
+        ) -> dict[str, Any]:
+            for key, payload in commands:
+                await coordinator.commands.async_publish(key, payload)
+            return {}
+
+        return await _async_fan_out(
+            async_get_targets(hass, call.data.get(ATTR_DEVICE_ID)),
+            async_command_device,
+            call.data[ATTR_CONCURRENCY],
+        )
+
+    async def async_handle_snapshot_state(call: ServiceCall) -> ServiceResponse:
+        """Remember the control state of devices under a name."""
+        name = call.data[ATTR_NAME]
+        persist = call.data[ATTR_PERSIST]
+        snapshots = async_get_snapshots()
+        results = {}
+        for device_id, target in async_get_targets(
+            hass, call.data.get(ATTR_DEVICE_ID)
+        ).items():
+            if isinstance(target, HomeAssistantError):
+                raise target
+            results[device_id] = await snapshots.async_take(target, name, persist)
+        return results
+
+    async def async_handle_restore_state(call: ServiceCall) -> ServiceResponse:
+        """Publish only the control topics that differ from a snapshot."""
+        name = call.data[ATTR_NAME]
+        snapshots = async_get_snapshots()
+
+        async def async_restore_device(
+            coordinator: BalluASP100Coordinator,
+        ) -> dict[str, Any]:
+            try:
+                published = await snapshots.async_restore(coordinator, name)
+            except KeyError as err:
+                raise HomeAssistantError(f"No snapshot named {name}") from err
+            return {"published": published}
+
+        return await _async_fan_out(
+            async_get_targets(hass, call.data.get(ATTR_DEVICE_ID)),
+            async_restore_device,
+            call.data[ATTR_CONCURRENCY],
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SNAPSHOT_STATE,
+        async_handle_snapshot_state,
+        schema=SNAPSHOT_STATE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RESTORE_STATE,
+        async_handle_restore_state,
+        schema=RESTORE_STATE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_COMMAND,
+        async_handle_bulk_command,
+        schema=BULK_COMMAND_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        async_handle_get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,114 @@
+"""Control state snapshots of Ballu ASP-100 devices."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .codec import CONTROL_KEYS, payloads_match
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import BalluASP100Coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.snapshots"
+STORAGE_VERSION = 1
+# Seconds to batch snapshot writes to disk
+SAVE_DELAY = 10
+
+
+class BalluASP100Snapshots:
+    """Named snapshots of device control state.
+
+    Snapshots hold the raw ``state/<key>`` payloads of the writable keys and
+    are keyed by device id and name. All snapshots live in memory; the ones
+    taken with ``persist`` are also written to a ``Store`` and survive a
+    restart.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the snapshots."""
+        self.hass = hass
+        self._store: Store[dict[str, dict[str, dict[str, Any]]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self._snapshots: dict[str, dict[str, dict[str, Any]]] = {}
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load persisted snapshots on first use."""
+        async with self._load_lock:
+            if self._loaded:
+                return
+            if (data := await self._store.async_load()) is not None:
+                # Snapshots taken before the load win over stored ones
+                for device_id, snapshots in data.items():
+                    device_snapshots = self._snapshots.setdefault(device_id, {})
+                    for name, snapshot in snapshots.items():
+                        device_snapshots.setdefault(name, snapshot)
+            self._loaded = True
+
+    async def async_take(
+        self, coordinator: BalluASP100Coordinator, name: str, persist: bool
+    ) -> dict[str, str]:
+        """Store the current control state of a device under a name."""
+        await self.async_load()
+        state = {
+            key: coordinator.control_state[key]
+            for key in CONTROL_KEYS
+            if key in coordinator.control_state
+        }
+        device_snapshots = self._snapshots.setdefault(coordinator.device_id, {})
+        previous = device_snapshots.get(name)
+        device_snapshots[name] = {"state": state, "persist": persist}
+        if persist or (previous is not None and previous["persist"]):
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        return state
+
+    async def async_restore(
+        self, coordinator: BalluASP100Coordinator, name: str
+    ) -> list[str]:
+        """Publish the keys whose state differs from a snapshot.
+
+        Returns the control keys that were published; keys already in the
+        snapshot state cost nothing.
+        """
+        await self.async_load()
+        snapshot = self._snapshots.get(coordinator.device_id, {}).get(name)
+        if snapshot is None:
+            raise KeyError(name)
+
+        published = []
+        for key, payload in snapshot["state"].items():
+            current = coordinator.control_state.get(key)
+            if current is not None and payloads_match(current, payload):
+                continue
+            await coordinator.commands.async_publish(key, payload)
+            published.append(key)
+        _LOGGER.debug(
+            "Restored snapshot %s of device %s, published %s",
+            name,
+            coordinator.device_id,
+            published,
+        )
+        return published
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Return the persistent snapshots."""
+        data: dict[str, dict[str, dict[str, Any]]] = {}
+        for device_id, snapshots in self._snapshots.items():
+            persistent = {
+                name: snapshot
+                for name, snapshot in snapshots.items()
+                if snapshot["persist"]
+            }
+            if persistent:
+                data[device_id] = persistent
+        return data
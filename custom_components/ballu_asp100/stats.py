@@ -0,0 +1,85 @@
+"""Runtime counters for Ballu ASP-100 message handling and publishing."""
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+
+# Recent handler durations kept per state key for percentile estimates
+DURATION_SAMPLES = 256
+
+
+def _percentile(samples: deque[int], fraction: float) -> int | None:
+    """Return a percentile of the samples, computed on read."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[int(fraction * (len(ordered) - 1))]
+
+
+class KeyStats:
+    """Counters of one state key.
+
+    Recording is a few integer additions; sorting for the p99 only happens
+    when the counters are read.
+    """
+
+    __slots__ = ("received", "decode_failures", "writes", "handler_ns", "_recent")
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.received = 0
+        self.decode_failures = 0
+        self.writes = 0
+        self.handler_ns = 0
+        self._recent: deque[int] = deque(maxlen=DURATION_SAMPLES)
+
+    def record(self, duration_ns: int, writes: int) -> None:
+        """Add a handled message."""
+        self.handler_ns += duration_ns
+        self.writes += writes
+        self._recent.append(duration_ns)
+
+    @property
+    def p99_ns(self) -> int | None:
+        """Return the p99 handler time of recent messages."""
+        return _percentile(self._recent, 0.99)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {
+            "received": self.received,
+            "decode_failures": self.decode_failures,
+            "state_writes": self.writes,
+            "handler_time_total_ms": round(self.handler_ns / 1e6, 3),
+            "handler_time_p99_us": (
+                round(p99 / 1e3, 1) if (p99 := self.p99_ns) is not None else None
+            ),
+        }
+
+
+class PublishStats:
+    """Counters of one control topic."""
+
+    __slots__ = ("published", "total_ms", "max_ms")
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.published = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, latency_ms: float) -> None:
+        """Add a completed publish."""
+        self.published += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {
+            "published": self.published,
+            "publish_latency_mean_ms": (
+                round(self.total_ms / self.published, 2) if self.published else None
+            ),
+            "publish_latency_max_ms": round(self.max_ms, 2),
+        }
@@ -6,11 +6,14 @@ from typing import Any
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.components import mqtt
-from homeassistant.core import HomeAssistant
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
 
 from .const import DOMAIN
+from .coordinator import BalluASP100Coordinator
+from .entity import BalluASP100Entity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,16 +42,13 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Ballu ASP-100 switches from config entry."""
-    data = config_entry.data
+    coordinator: BalluASP100Coordinator = hass.data[DOMAIN][config_entry.entry_id]
     
     switches = []
     for switch_key, switch_config in SWITCH_TYPES.items():
         switches.append(
             BalluASP100Switch(
-                hass,
-                data["device_id"],
-                data["device_type"],
-                data["name"],
+                coordinator,
                 switch_key,
                 switch_config,
                 config_entry.entry_id,
@@ -57,46 +57,28 @@ async def async_setup_entry(
     
     async_add_entities(switches)
 
-class BalluASP100Switch(SwitchEntity):
+class BalluASP100Switch(BalluASP100Entity, SwitchEntity, RestoreEntity):
     """Representation of a Ballu ASP-100 switch."""
 
     def __init__(
         self,
-        hass: HomeAssistant,
-        device_id: str,
-        device_type: str,
-        device_name: str,
+        coordinator: BalluASP100Coordinator,
         switch_key: str,
         switch_config: dict,
         entry_id: str,
     ) -> None:
         """Initialize the switch."""
-        self.hass = hass
-        self._device_id = device_id
-        self._device_type = device_type
-        self._device_name = device_name
+        super().__init__(coordinator)
         self._switch_key = switch_key
         self._switch_config = switch_config
         self._entry_id = entry_id
         
         self._attr_name = f"{switch_config['name']}"
-        self._attr_unique_id = f"ballu_asp100_{device_id}_{switch_key}"
+        self._attr_unique_id = f"ballu_asp100_{coordinator.device_id}_{switch_key}"
         self._attr_icon = switch_config["icon"]
         self._attr_entity_registry_enabled_default = switch_config.get("enabled_default", True)
         
         self._is_on = False
-        self._command_topic_base = f"rusclimate/{device_type}/{device_id}/control"
-        self._state_topic_base = f"rusclimate/{device_type}/{device_id}/state"
-
-    @property
-    def device_info(self):
-        """Return device info."""
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": self._device_name,
-            "manufacturer": "Ballu",
-            "model": "ONEAIR ASP-100",
-        }
 
     @property
     def is_on(self) -> bool:
@@ -105,46 +87,36 @@ class BalluASP100Switch(SwitchEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
-        topic = f"{self._command_topic_base}/{self._switch_config['key']}"
-        
-        await mqtt.async_publish(
-            self.hass,
-            topic,
+        await self._coordinator.commands.async_publish(
+            self._switch_config["key"],
             self._switch_config["payload_on"],
-            qos=1,
-            retain=False,
+            self._rollback_to(_is_on=self._is_on),
         )
         self._is_on = True
         self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the switch off."""
-        topic = f"{self._command_topic_base}/{self._switch_config['key']}"
-        
-        await mqtt.async_publish(
-            self.hass,
-            topic,
+        await self._coordinator.commands.async_publish(
+            self._switch_config["key"],
             self._switch_config["payload_off"],
-            qos=1,
-            retain=False,
+            self._rollback_to(_is_on=self._is_on),
         )
         self._is_on = False
         self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
-        """Subscribe to MQTT topics when entity is added to hass."""
-        topic = f"{self._state_topic_base}/{self._switch_config['key']}"
-        
-        await mqtt.async_subscribe(
-            self.hass,
-            topic,
-            self._message_received,
-        )
+        """Register for the switch state key when entity is added to hass."""
+        await super().async_added_to_hass()
+        last_state = await self.async_get_last_state()
+        if last_state is not None and last_state.state in (STATE_ON, STATE_OFF):
+            self._is_on = last_state.state == STATE_ON
+            self._coordinator.restored_entities += 1
+        self._async_listen(self._switch_config["key"], self._message_received)
 
-    def _message_received(self, message):
-        """Handle new MQTT messages."""
-        try:
-            self._is_on = message.payload == self._switch_config["payload_on"]
-            self.async_write_ha_state()
-        except Exception as err:
-            _LOGGER.error("Error processing message for %s: %s", self.name, err)
\ No newline at end of file
+    @callback
+    def _message_received(self, is_on: bool) -> None:
+        """Handle a decoded switch state."""
+        changed = is_on != self._is_on
+        self._is_on = is_on
+        self._async_write_if_changed(changed)
\ No newline at end of file
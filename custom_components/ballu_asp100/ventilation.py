@@ -0,0 +1,197 @@
+"""Closed-loop CO2 ventilation control for Ballu ASP-100."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .const import MODE_MAPPING
+
+if TYPE_CHECKING:
+    from .coordinator import BalluASP100Coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+MODE_COMFORT = MODE_MAPPING["comfort"]
+MODE_BOOST = MODE_MAPPING["boost"]
+
+
+class BalluASP100VentilationController:
+    """Adjust fan speed of one device from its own CO2 readings.
+
+    Readings are taken straight from the coordinator's ``sensor/co2``
+    listeners, so a reaction costs one callback and one publish instead of a
+    trip through the state machine and an automation.
+
+    The controller only acts while the unit runs in manual (``comfort``)
+    mode; other modes are treated as a user override. Speed is stepped by
+    one above ``target + hysteresis`` and below ``target - hysteresis``,
+    kept within ``[min_speed, max_speed]`` and changed at most once per
+    ``step_interval``. With ``boost_level`` set, readings at or above it
+    switch the unit to boost, and the controller returns it to manual mode
+    once CO2 is back in the band.
+
+    Speed changes and boosts are counted once the broker took the command;
+    a failed publish is logged and counted in ``publish_failures``.
+    """
+
+    def __init__(
+        self,
+        coordinator: BalluASP100Coordinator,
+        target: int,
+        hysteresis: int,
+        min_speed: int,
+        max_speed: int,
+        step_interval: float,
+        boost_level: int = 0,
+    ) -> None:
+        """Initialize the controller."""
+        self._coordinator = coordinator
+        self._high = target + hysteresis
+        self._low = target - hysteresis
+        self._min_speed = min_speed
+        self._max_speed = max_speed
+        self._step_interval = step_interval
+        self._boost_level = boost_level
+
+        self._mode: int | None = None
+        self._speed: int | None = None
+        self._co2: int | None = None
+        self._boosted = False
+        self._last_command = -step_interval
+        self._remove_listeners: list[CALLBACK_TYPE] = []
+
+        self.speed_changes = 0
+        self.boosts = 0
+        self.rate_limited = 0
+        self.publish_failures = 0
+
+    @callback
+    def async_start(self) -> None:
+        """Start following the device state."""
+        add_listener = self._coordinator.async_add_listener
+        self._remove_listeners = [
+            add_listener("mode", self._mode_received),
+            add_listener("speed", self._speed_received),
+            add_listener("sensor/co2", self._co2_received),
+        ]
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following the device state."""
+        for remove_listener in self._remove_listeners:
+            remove_listener()
+        self._remove_listeners.clear()
+
+    @callback
+    def _mode_received(self, mode: int) -> None:
+        """Track the operating mode."""
+        if mode != MODE_BOOST:
+            # Boost ended on the device timer or was replaced by the user
+            self._boosted = False
+        self._mode = mode
+
+    @callback
+    def _speed_received(self, speed: int) -> None:
+        """Track the fan speed."""
+        self._speed = speed
+
+    @callback
+    def _co2_received(self, co2: int) -> None:
+        """React to a CO2 reading."""
+        self._co2 = co2
+        if self._mode is None or self._speed is None:
+            # Wait for the retained control state before acting
+            return
+
+        if self._mode == MODE_BOOST:
+            if self._boosted and co2 <= self._high:
+                self._async_command("mode", MODE_COMFORT)
+            return
+        if self._mode != MODE_COMFORT:
+            return
+
+        if self._boost_level and co2 >= self._boost_level:
+            self._async_command("mode", MODE_BOOST, self._boost_sent)
+            return
+
+        if co2 >= self._high:
+            speed = self._speed + 1
+        elif co2 <= self._low:
+            speed = self._speed - 1
+        else:
+            return
+        speed = min(max(speed, self._min_speed), self._max_speed)
+        if speed != self._speed:
+            self._async_command("speed", speed, self._speed_sent)
+
+    @callback
+    def _boost_sent(self) -> None:
+        """Count a boost the controller started."""
+        self._boosted = True
+        self.boosts += 1
+
+    @callback
+    def _speed_sent(self) -> None:
+        """Count a speed step."""
+        self.speed_changes += 1
+
+    @callback
+    def _async_command(
+        self, key: str, value: int, on_sent: Callable[[], None] | None = None
+    ) -> None:
+        """Publish a control command unless the rate limit holds it back.
+
+        ``on_sent`` is called once the command is published.
+        """
+        now = time.monotonic()
+        if now - self._last_command < self._step_interval:
+            self.rate_limited += 1
+            return
+        self._last_command = now
+        _LOGGER.debug(
+            "CO2 %s ppm on device %s, setting %s to %s",
+            self._co2,
+            self._coordinator.device_id,
+            key,
+            value,
+        )
+        self._coordinator.hass.async_create_task(
+            self._async_publish(key, value, on_sent)
+        )
+
+    async def _async_publish(
+        self, key: str, value: int, on_sent: Callable[[], None] | None
+    ) -> None:
+        """Publish a control command and report the outcome."""
+        try:
+            await self._coordinator.commands.async_publish(key, str(value))
+        except Exception as err:  # noqa: BLE001
+            self.publish_failures += 1
+            _LOGGER.warning(
+                "Could not set %s to %s on device %s: %s",
+                key,
+                value,
+                self._coordinator.device_id,
+                err,
+            )
+            return
+        if on_sent is not None:
+            on_sent()
+
+    def as_diagnostics(self) -> dict[str, Any]:
+        """Return controller settings and counters."""
+        return {
+            "band_ppm": [self._low, self._high],
+            "speed_bounds": [self._min_speed, self._max_speed],
+            "step_interval": self._step_interval,
+            "boost_level": self._boost_level,
+            "last_co2": self._co2,
+            "speed_changes": self.speed_changes,
+            "boosts": self.boosts,
+            "rate_limited": self.rate_limited,
+            "publish_failures": self.publish_failures,
+        }
@@ -0,0 +1,53 @@
+"""Fleet-wide availability watchdog for Ballu ASP-100."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .services import async_get_coordinators
+
+# How often the silence of every device is checked
+WATCHDOG_INTERVAL = timedelta(seconds=30)
+
+
+class BalluASP100Watchdog:
+    """Mark silent devices unavailable with one timer for the whole fleet.
+
+    Coordinators stamp ``last_seen`` on every state message and recover on
+    their own with the next one; the watchdog only looks for devices that
+    stayed silent longer than their ``stale_timeout``. Timer overhead stays
+    the same no matter how many devices are loaded.
+
+    The same timer ticks the coordinators of available devices, for entities
+    that need to follow time between state messages.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the watchdog."""
+        self.hass = hass
+        self._unsubscribe: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start the shared timer."""
+        self._unsubscribe = async_track_time_interval(
+            self.hass, self._async_scan, WATCHDOG_INTERVAL
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the shared timer."""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    @callback
+    def _async_scan(self, _now: datetime) -> None:
+        """Check every loaded device for silence and tick the others."""
+        now = time.monotonic()
+        for coordinator in async_get_coordinators(self.hass):
+            coordinator.async_check_stale(now)
+            coordinator.async_tick()
@@ -0,0 +1,106 @@
+"""Fixtures for the Ballu ASP-100 tests.
+
+Tests run against a bare Home Assistant instance with the in-process broker
+from ``tools/simulator.py`` installed in place of the MQTT integration, the
+same setup ``tools/benchmark.py`` uses.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Coroutine, Iterator
+from pathlib import Path
+import sys
+import time
+from typing import Any, TypeVar
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "tools"))
+
+from benchmark import async_create_hass  # noqa: E402
+
+_T = TypeVar("_T")
+
+# Loop iterations run after moving the clock, enough for a timer to
+# schedule a retry and the retry to be published
+SETTLE_ITERATIONS = 10
+
+
+@pytest.fixture(scope="session")
+def config_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Return a config dir that makes the integration importable."""
+    config_dir = tmp_path_factory.mktemp("config")
+    (config_dir / "custom_components").symlink_to(REPO_ROOT / "custom_components")
+    sys.path.insert(0, str(config_dir))
+    return config_dir
+
+
+@pytest.fixture
+def run() -> Iterator[Callable[[Coroutine[Any, Any, _T]], _T]]:
+    """Run coroutines on an event loop owned by the test.
+
+    Tests stay synchronous so the ``benchmark`` fixture can time plain
+    callables; the loop is closed after the test.
+    """
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture
+def hass(
+    run: Callable[[Coroutine[Any, Any, Any]], Any], config_dir: Path, tmp_path: Path
+) -> Iterator[Any]:
+    """Return a Home Assistant instance wired to the in-process broker."""
+    hass = run(async_create_hass(tmp_path))
+    yield hass
+    run(hass.async_stop(force=True))
+
+
+@pytest.fixture
+def broker(hass: Any) -> Any:
+    """Return the in-process broker of ``hass``."""
+    return hass.data["benchmark_broker"]
+
+
+class Clock:
+    """Monotonic clock the test moves forward by hand.
+
+    The event loop reads the same clock, so Home Assistant timers and
+    ``asyncio.sleep`` fire as if the time had passed.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[Coroutine[Any, Any, Any]], Any],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Start following the real clock."""
+        self._run = run
+        self._offset = 0.0
+        monotonic = time.monotonic
+        monkeypatch.setattr(time, "monotonic", lambda: monotonic() + self._offset)
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock and run what became due.
+
+        Tasks still waiting for a later time, like a rate-limited queue,
+        are left waiting instead of being awaited.
+        """
+        self._offset += seconds
+        for _ in range(SETTLE_ITERATIONS):
+            self._run(asyncio.sleep(0))
+
+
+@pytest.fixture
+def clock(
+    run: Callable[[Coroutine[Any, Any, Any]], Any],
+    hass: Any,
+    monkeypatch: pytest.MonkeyPatch,
+) -> Clock:
+    """Return a clock driving the timers of ``hass``.
+
+    Depends on ``hass`` so the real clock is back before it is stopped.
+    """
+    return Clock(run, monkeypatch)
@@ -0,0 +1,158 @@
+"""Benchmarks of message handling, setup time and command throughput.
+
+Run with pytest-benchmark; ``--benchmark-json`` stores the results and
+``--benchmark-compare`` checks them against an earlier run::
+
+    pytest tests/test_benchmark.py --benchmark-autosave
+    pytest tests/test_benchmark.py --benchmark-compare --benchmark-compare-fail=mean:20%
+"""
+from __future__ import annotations
+
+import itertools
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from benchmark import (
+    DISCOVERY_DEVICE_COUNTS,
+    DOMAIN,
+    HUB_DEVICE_COUNTS,
+    SETUP_ENTRY_COUNTS,
+    STATE_PAYLOADS,
+    async_enable_all_entities,
+    device_id_for,
+    make_entry,
+)
+from simulator import InProcessBroker, ReceiveMessage, SimulatedDevice
+
+pytest.importorskip("pytest_benchmark")
+
+
+async def _async_add_entries(hass: Any, entries: list[Any]) -> None:
+    """Set up config entries and wait until their platforms are done."""
+    for entry in entries:
+        await hass.config_entries.async_add(entry)
+    await hass.async_block_till_done()
+
+
+@pytest.mark.parametrize("changing", [True, False], ids=["changed", "repeated"])
+@pytest.mark.parametrize("key", list(STATE_PAYLOADS))
+def test_handler(benchmark, run, hass, broker, key: str, changing: bool) -> None:
+    """Measure one state message through the dispatcher and its handlers."""
+    entry = make_entry(0)
+    run(_async_add_entries(hass, [entry]))
+    run(async_enable_all_entities(hass, entry))
+
+    topic = f"rusclimate/69/{entry.data['device_id']}/state/{key}"
+    payloads = STATE_PAYLOADS[key] if changing else STATE_PAYLOADS[key][:1]
+    cycle = itertools.cycle(payloads)
+    benchmark(lambda: broker.publish(topic, next(cycle)))
+
+
+@pytest.mark.parametrize("count", SETUP_ENTRY_COUNTS)
+def test_setup_entries(benchmark, run, hass, count: int) -> None:
+    """Measure async_setup_entry wall time for a number of config entries."""
+    entries = [make_entry(index) for index in range(count)]
+    benchmark.pedantic(run, args=(_async_add_entries(hass, entries),), rounds=1)
+    assert len(hass.data[DOMAIN]) >= count
+
+
+@pytest.fixture
+def coordinator(run, hass, broker, monkeypatch: pytest.MonkeyPatch) -> Any:
+    """Set up one device that echoes its commands, without a rate limit."""
+    from custom_components.ballu_asp100 import commands
+
+    # Measure the publisher itself, not the per-device rate limit
+    monkeypatch.setattr(commands, "COMMAND_RATE", 1e9)
+    entry = make_entry(0)
+    run(_async_add_entries(hass, [entry]))
+    device = SimulatedDevice(broker, entry.data["device_id"])
+    device.start()
+    yield hass.data[DOMAIN][entry.entry_id]
+    device.stop()
+
+
+def test_command_publisher(benchmark, run, coordinator) -> None:
+    """Measure one command through the publisher until it is sent."""
+    values = itertools.cycle("012345")
+    benchmark(lambda: run(coordinator.commands.async_publish("amount", next(values))))
+    assert coordinator.commands.confirmed > 0
+
+
+def test_command_service(benchmark, run, hass, coordinator) -> None:
+    """Measure one switch service call down to the published command."""
+    entity_id = hass.states.async_all("switch")[0].entity_id
+    services = itertools.cycle(["turn_on", "turn_off"])
+    benchmark(
+        lambda: run(
+            hass.services.async_call(
+                "switch", next(services), {"entity_id": entity_id}, blocking=True
+            )
+        )
+    )
+
+
+@pytest.mark.parametrize("count", HUB_DEVICE_COUNTS)
+def test_hub_route(
+    benchmark, run, config_dir, monkeypatch: pytest.MonkeyPatch, count: int
+) -> None:
+    """Measure hub routing of one message as the fleet grows."""
+    from custom_components.ballu_asp100.hub import BalluASP100Hub
+    from homeassistant.components import mqtt
+
+    monkeypatch.setattr(mqtt, "async_subscribe", InProcessBroker().async_subscribe)
+    hub = BalluASP100Hub(None)
+    messages = []
+    for index in range(count):
+        device_id = device_id_for(index)
+        run(
+            hub.async_register(
+                SimpleNamespace(
+                    device_type="69",
+                    device_id=device_id,
+                    async_dispatch=lambda key, message: None,
+                )
+            )
+        )
+        messages.append(
+            ReceiveMessage(
+                f"rusclimate/69/{device_id}/state/sensor/co2",
+                "640",
+                0,
+                False,
+                "rusclimate/+/+/state/#",
+                0.0,
+            )
+        )
+    cycle = itertools.cycle(messages)
+    benchmark(lambda: hub._message_received(next(cycle)))
+
+
+@pytest.mark.parametrize("key", list(STATE_PAYLOADS))
+def test_codec_decode(benchmark, config_dir, key: str) -> None:
+    """Measure decoding one payload of a state key."""
+    from custom_components.ballu_asp100.codec import decode
+
+    benchmark(decode, key, STATE_PAYLOADS[key][0])
+
+
+@pytest.mark.parametrize("count", DISCOVERY_DEVICE_COUNTS)
+def test_discovery_flood(benchmark, config_dir, count: int) -> None:
+    """Measure the discovery engine on a flood of synthetic topics."""
+    from custom_components.ballu_asp100.discovery import DiscoveryEngine
+
+    topics = [
+        f"rusclimate/69/{device_id_for(index)}/state/{key}"
+        for _ in range(3)
+        for index in range(count)
+        for key in ("temperature", "speed", "mode", "sensor/co2", "diag/gw_loss")
+    ]
+
+    def feed_all() -> int:
+        engine = DiscoveryEngine()
+        for topic in topics:
+            engine.feed(topic)
+        return len(engine.results())
+
+    assert benchmark(feed_all) == count
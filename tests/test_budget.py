@@ -0,0 +1,51 @@
+"""Import cost and setup time must stay within their budgets."""
+from __future__ import annotations
+
+import time
+
+from benchmark import (
+    DOMAIN,
+    IMPORT_BUDGET_MS,
+    ON_DEMAND_MODULES,
+    SETUP_500_BUDGET_S,
+    bench_import,
+    make_entry,
+)
+
+
+def test_import_budget() -> None:
+    """Importing what async_setup_entry needs stays under the budget."""
+    results = bench_import()
+
+    total_ms = results["import.setup_modules.total_ms"]
+    assert total_ms > 0
+    assert total_ms <= IMPORT_BUDGET_MS, (
+        f"setup modules took {total_ms:.1f} ms to import, "
+        f"budget is {IMPORT_BUDGET_MS} ms"
+    )
+    eager = [
+        module
+        for module in ON_DEMAND_MODULES
+        if f"import.{module.lstrip('.')}.self_ms" in results
+    ]
+    assert not eager, f"on-demand modules imported eagerly: {eager}"
+
+
+def test_setup_500_entries_budget(run, hass) -> None:
+    """Setting up 500 config entries stays under the budget."""
+    entries = [make_entry(index) for index in range(500)]
+
+    async def async_add_entries() -> None:
+        for entry in entries:
+            await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+
+    started = time.perf_counter()
+    run(async_add_entries())
+    elapsed = time.perf_counter() - started
+
+    assert all(entry.entry_id in hass.data[DOMAIN] for entry in entries)
+    assert elapsed <= SETUP_500_BUDGET_S, (
+        f"500 entries took {elapsed:.2f} s to set up, "
+        f"budget is {SETUP_500_BUDGET_S} s"
+    )
@@ -0,0 +1,205 @@
+"""Tests for the command publisher."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+TOPIC_BASE = "rusclimate/69/00000000000000000000000000000000/control"
+# The test clock keeps running in real time between moves
+REAL_TIME_SLACK = 0.02
+
+
+@pytest.fixture
+def sent(broker) -> list[tuple[str, str]]:
+    """Return the commands published, as control key and payload."""
+    commands: list[tuple[str, str]] = []
+    broker.subscribe(
+        f"{TOPIC_BASE}/#",
+        lambda message: commands.append(
+            (message.topic.rsplit("/", 1)[1], message.payload)
+        ),
+    )
+    return commands
+
+
+@pytest.fixture
+def publisher(hass, clock) -> Any:
+    """Return a publisher without debounce."""
+    from custom_components.ballu_asp100.commands import BalluASP100CommandPublisher
+
+    return BalluASP100CommandPublisher(hass, TOPIC_BASE, 0)
+
+
+def test_echo_confirms_command(run, clock, publisher, sent) -> None:
+    """The echo of the same value confirms a command; other values do not."""
+    from custom_components.ballu_asp100.commands import COMMAND_ACK_TIMEOUT
+
+    rollbacks = []
+    run(publisher.async_publish("temperature", "22", lambda: rollbacks.append(1)))
+    clock.advance(0.2)
+
+    publisher.async_handle_echo("temperature", "21")
+    publisher.async_handle_echo("speed", "22")
+    assert publisher.confirmed == 0
+
+    publisher.async_handle_echo("temperature", "22.0")
+    assert publisher.confirmed == 1
+    assert publisher.latency.count == 1
+    assert publisher.latency.last >= 200
+
+    clock.advance(COMMAND_ACK_TIMEOUT * 3)
+    assert sent == [("temperature", "22")]
+    assert (publisher.retried, publisher.rolled_back, rollbacks) == (0, 0, [])
+
+
+def test_retry_then_roll_back(run, clock, publisher, sent) -> None:
+    """An unconfirmed command is republished COMMAND_RETRIES times, then rolled back."""
+    from custom_components.ballu_asp100.commands import (
+        COMMAND_ACK_TIMEOUT,
+        COMMAND_RETRIES,
+    )
+
+    rollbacks = []
+    run(publisher.async_publish("mode", "4", lambda: rollbacks.append(1)))
+
+    for retry in range(COMMAND_RETRIES):
+        clock.advance(COMMAND_ACK_TIMEOUT)
+        assert publisher.retried == retry + 1
+        assert rollbacks == []
+    assert sent == [("mode", "4")] * (COMMAND_RETRIES + 1)
+
+    clock.advance(COMMAND_ACK_TIMEOUT)
+    assert rollbacks == [1]
+    assert publisher.rolled_back == 1
+    assert publisher.as_diagnostics()["in_flight"] == 0
+
+    # A late echo changes nothing and nothing else is sent
+    publisher.async_handle_echo("mode", "4")
+    clock.advance(COMMAND_ACK_TIMEOUT * 3)
+    assert (publisher.confirmed, rollbacks) == (0, [1])
+    assert len(sent) == COMMAND_RETRIES + 1
+
+
+def test_echo_during_retry_confirms(run, clock, publisher, sent) -> None:
+    """An echo after a retry confirms the command without a rollback."""
+    from custom_components.ballu_asp100.commands import COMMAND_ACK_TIMEOUT
+
+    rollbacks = []
+    run(publisher.async_publish("speed", "3", lambda: rollbacks.append(1)))
+    clock.advance(COMMAND_ACK_TIMEOUT)
+    publisher.async_handle_echo("speed", "3")
+    clock.advance(COMMAND_ACK_TIMEOUT * 3)
+
+    assert (publisher.retried, publisher.confirmed, rollbacks) == (1, 1, [])
+
+
+def test_newer_command_keeps_first_rollback(run, clock, publisher) -> None:
+    """Rolling back restores the state before the oldest unconfirmed command."""
+    from custom_components.ballu_asp100.commands import (
+        COMMAND_ACK_TIMEOUT,
+        COMMAND_RETRIES,
+    )
+
+    rollbacks = []
+    run(publisher.async_publish("speed", "3", lambda: rollbacks.append("first")))
+    run(publisher.async_publish("speed", "4", lambda: rollbacks.append("second")))
+    for _ in range(COMMAND_RETRIES + 1):
+        clock.advance(COMMAND_ACK_TIMEOUT)
+
+    assert rollbacks == ["first"]
+
+
+@pytest.fixture
+def slow_publisher(hass, clock, monkeypatch: pytest.MonkeyPatch) -> Any:
+    """Return a publisher that may send one command every ten seconds."""
+    from custom_components.ballu_asp100 import commands
+
+    monkeypatch.setattr(commands, "COMMAND_RATE", 0.1)
+    monkeypatch.setattr(commands, "COMMAND_BURST", 1)
+    return commands.BalluASP100CommandPublisher(hass, TOPIC_BASE, 0)
+
+
+def test_token_bucket_refill_and_burst(clock) -> None:
+    """A full bucket allows a burst, then refills at the rate up to the burst."""
+    from custom_components.ballu_asp100.commands import TokenBucket
+
+    bucket = TokenBucket(2.0, 3)
+    assert [bucket.take() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take() == pytest.approx(0.5, abs=REAL_TIME_SLACK)
+
+    clock.advance(0.25)
+    assert bucket.take() == pytest.approx(0.25, abs=REAL_TIME_SLACK)
+
+    # Refill stops at the burst size
+    clock.advance(60)
+    assert [bucket.take() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take() > 0
+
+
+def test_queued_command_replaced_in_place(
+    run, hass, clock, slow_publisher, sent
+) -> None:
+    """A queued command is replaced by a newer one for the same key."""
+    run(slow_publisher.async_publish("amount", "1"))
+    first = hass.async_create_task(slow_publisher.async_publish("volume", "1"))
+    second = hass.async_create_task(slow_publisher.async_publish("volume", "0"))
+    clock.advance(1)
+    assert sent == [("amount", "1")]
+    assert slow_publisher.dropped == 1
+    assert slow_publisher.as_diagnostics()["queue_depth"] == 1
+
+    clock.advance(10)
+    assert sent == [("amount", "1"), ("volume", "0")]
+    # Both callers are done once the newest payload is sent
+    assert first.done() and second.done()
+    assert slow_publisher.rate_limited >= 1
+
+
+def test_timeout_starts_when_sent(run, hass, clock, slow_publisher, sent) -> None:
+    """Time spent waiting for the rate limit does not count against the echo."""
+    from custom_components.ballu_asp100.commands import COMMAND_ACK_TIMEOUT
+
+    run(slow_publisher.async_publish("amount", "1"))
+    slow_publisher.async_handle_echo("amount", "1")
+    hass.async_create_task(slow_publisher.async_publish("volume", "1"))
+
+    # Longer than the echo timeout, still waiting for a token
+    clock.advance(COMMAND_ACK_TIMEOUT + 1)
+    assert sent == [("amount", "1")]
+    assert slow_publisher.retried == 0
+
+    clock.advance(5)
+    assert sent == [("amount", "1"), ("volume", "1")]
+    clock.advance(COMMAND_ACK_TIMEOUT - 1)
+    assert slow_publisher.retried == 0
+
+    clock.advance(1)
+    assert slow_publisher.retried == 1
+
+
+def test_publish_failure_rolls_back(
+    run, clock, publisher, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A command the broker did not take is rolled back and raised."""
+    from homeassistant.components import mqtt
+    from homeassistant.exceptions import HomeAssistantError
+
+    from custom_components.ballu_asp100.commands import COMMAND_ACK_TIMEOUT
+
+    async def async_publish(*args: Any, **kwargs: Any) -> None:
+        raise HomeAssistantError("broker gone")
+
+    monkeypatch.setattr(mqtt, "async_publish", async_publish)
+    rollbacks = []
+    with pytest.raises(HomeAssistantError):
+        run(publisher.async_publish("backlight", "1", lambda: rollbacks.append(1)))
+
+    assert rollbacks == [1]
+    assert publisher.rolled_back == 1
+    assert publisher.as_diagnostics()["in_flight"] == 0
+
+    # No echo timeout is left to retry or roll back a second time
+    clock.advance(COMMAND_ACK_TIMEOUT * 3)
+    assert (publisher.retried, rollbacks) == (0, [1])
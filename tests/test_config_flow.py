@@ -0,0 +1,81 @@
+"""Tests for the Ballu ASP-100 config flow."""
+from __future__ import annotations
+
+from typing import Any
+
+from benchmark import DOMAIN, device_id_for, make_entry
+
+
+def _service_info(topic: str) -> Any:
+    """Return what the MQTT integration passes for a manifest topic."""
+    from homeassistant.helpers.service_info.mqtt import MqttServiceInfo
+
+    return MqttServiceInfo(
+        topic=topic,
+        payload="1",
+        qos=0,
+        retain=True,
+        subscribed_topic="rusclimate/+/+/state/#",
+        timestamp=0.0,
+    )
+
+
+def _async_mqtt_flow(hass, topic: str):
+    """Start a flow the way the MQTT integration does."""
+    return hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": "mqtt"}, data=_service_info(topic)
+    )
+
+
+def test_manifest_subscribes_state_topics(run, hass) -> None:
+    """The MQTT integration watches state topics for this integration."""
+    from homeassistant import loader
+
+    assert run(loader.async_get_mqtt(hass))[DOMAIN] == ["rusclimate/+/+/state/#"]
+
+
+def test_mqtt_discovery_creates_entry(run, hass) -> None:
+    """A state topic of an unknown unit leads to a confirm step."""
+    from homeassistant.data_entry_flow import FlowResultType
+
+    device_id = device_id_for(1)
+    result = run(_async_mqtt_flow(hass, f"rusclimate/69/{device_id}/state/mode"))
+
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "discovery_confirm"
+
+    result = run(
+        hass.config_entries.flow.async_configure(result["flow_id"], {"name": "Room"})
+    )
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["data"] == {"device_id": device_id, "device_type": "69", "name": "Room"}
+    run(hass.async_block_till_done())
+
+
+def test_mqtt_discovery_ignores_other_topics(run, hass) -> None:
+    """Topics that do not identify a unit keep the MQTT subscription."""
+    from homeassistant.data_entry_flow import FlowResultType
+
+    device_id = device_id_for(1)
+    for topic in (
+        f"rusclimate/69/{device_id}/state/diag/gw_loss",
+        "rusclimate/69/not-a-device/state/mode",
+    ):
+        result = run(_async_mqtt_flow(hass, topic))
+        assert result["type"] == FlowResultType.ABORT
+        assert result["reason"] == "not_ballu_device"
+
+
+def test_mqtt_discovery_configured_device(run, hass) -> None:
+    """A configured unit aborts, which ends the MQTT subscription."""
+    from homeassistant.data_entry_flow import FlowResultType
+
+    entry = make_entry(0)
+    run(hass.config_entries.async_add(entry))
+    run(hass.async_block_till_done())
+
+    topic = f"rusclimate/69/{entry.data['device_id']}/state/mode"
+    result = run(_async_mqtt_flow(hass, topic))
+
+    assert result["type"] == FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
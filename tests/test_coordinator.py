@@ -0,0 +1,121 @@
+"""Tests for the per-device state coordinator."""
+from __future__ import annotations
+
+import pytest
+
+from benchmark import DOMAIN, async_enable_all_entities, make_entry
+from simulator import ReceiveMessage
+
+
+def _setup_entry(run, hass, entry):
+    """Set up an entry without passive discovery listening next to it."""
+    run(hass.config_entries.async_add(entry))
+    run(hass.async_block_till_done())
+    hass.data[DOMAIN]["passive_discovery"].async_stop()
+    return hass.data[DOMAIN][entry.entry_id]
+
+
+def test_disabled_entities_are_not_subscribed(run, hass, broker) -> None:
+    """Keys used only by disabled entities cost neither delivery nor dispatch."""
+    entry = make_entry(0)
+    coordinator = _setup_entry(run, hass, entry)
+    topic = f"{coordinator.state_topic_base}/diag/rssi"
+
+    assert "diag/rssi" not in coordinator.as_diagnostics()["subscribed_keys"]
+    delivered = broker.delivered
+    broker.publish(topic, "-61")
+    assert broker.delivered == delivered
+    assert "diag/rssi" not in coordinator.key_stats
+
+    run(async_enable_all_entities(hass, entry))
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    assert "diag/rssi" in coordinator.as_diagnostics()["subscribed_keys"]
+    broker.publish(topic, "-61")
+    assert broker.delivered == delivered + 1
+    assert coordinator.key_stats["diag/rssi"].received == 1
+
+
+def test_control_keys_are_always_subscribed(run, hass, broker) -> None:
+    """Writable keys are subscribed even without listeners, for echoes."""
+    coordinator = _setup_entry(run, hass, make_entry(0))
+
+    broker.publish(f"{coordinator.state_topic_base}/volume", "1")
+
+    assert coordinator.control_state["volume"] == "1"
+
+
+def _message(coordinator, key: str, payload: str) -> ReceiveMessage:
+    """Return a state message of the device."""
+    return ReceiveMessage(
+        f"{coordinator.state_topic_base}/{key}",
+        payload,
+        0,
+        False,
+        f"{coordinator.state_topic_base}/{key}",
+        0.0,
+    )
+
+
+@pytest.fixture
+def decoded(config_dir, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Count calls of the CO2 and RSSI decoders."""
+    from custom_components.ballu_asp100 import codec
+
+    calls: list[str] = []
+    for key in ("sensor/co2", "diag/rssi"):
+        decoder = codec.DECODERS[key]
+
+        def counting(payload: str, key=key, decoder=decoder):
+            calls.append(key)
+            return decoder(payload)
+
+        monkeypatch.setitem(codec.DECODERS, key, counting)
+    return calls
+
+
+def test_dispatch_per_key(run, hass, broker, decoded) -> None:
+    """A message reaches the listeners of its key only, decoded once."""
+    coordinator = _setup_entry(run, hass, make_entry(0))
+    co2: list[int] = []
+    mode: list[int] = []
+    coordinator.async_add_listener("sensor/co2", co2.append)
+    coordinator.async_add_listener("sensor/co2", co2.append)
+    coordinator.async_add_listener("mode", mode.append)
+
+    coordinator.async_dispatch("sensor/co2", _message(coordinator, "sensor/co2", "640"))
+
+    assert co2 == [640, 640]
+    assert mode == []
+    assert decoded == ["sensor/co2"]
+
+
+def test_decode_only_with_listeners(run, hass, broker, decoded) -> None:
+    """Keys without listeners are counted but never decoded."""
+    coordinator = _setup_entry(run, hass, make_entry(0))
+
+    coordinator.async_dispatch("diag/rssi", _message(coordinator, "diag/rssi", "-61"))
+
+    assert decoded == []
+    assert coordinator.key_stats["diag/rssi"].received == 1
+
+    rssi: list[int] = []
+    remove = coordinator.async_add_listener("diag/rssi", rssi.append)
+    coordinator.async_dispatch("diag/rssi", _message(coordinator, "diag/rssi", "-61"))
+    remove()
+    coordinator.async_dispatch("diag/rssi", _message(coordinator, "diag/rssi", "-62"))
+
+    assert rssi == [-61]
+    assert decoded == ["diag/rssi"]
+
+
+def test_invalid_payload_is_counted(run, hass, broker) -> None:
+    """A payload that does not decode is counted and not dispatched."""
+    coordinator = _setup_entry(run, hass, make_entry(0))
+    co2: list[int] = []
+    coordinator.async_add_listener("sensor/co2", co2.append)
+
+    coordinator.async_dispatch("sensor/co2", _message(coordinator, "sensor/co2", "n/a"))
+
+    assert co2 == []
+    assert coordinator.key_stats["sensor/co2"].decode_failures == 1
@@ -0,0 +1,97 @@
+"""Tests for the filter depletion model."""
+from __future__ import annotations
+
+import pytest
+
+# Seconds between runtime updates, as the watchdog ticks
+TICK = 30.0
+
+
+@pytest.fixture
+def model(config_dir):
+    """Return an empty model."""
+    from custom_components.ballu_asp100.filter_model import FilterDepletionModel
+
+    return FilterDepletionModel()
+
+
+def _run(model, start: float, hours: float) -> float:
+    """Advance the model tick by tick and return the end time."""
+    now = start
+    end = start + hours * 3600
+    while now < end:
+        now = min(now + TICK, end)
+        model.advance(now)
+    return now
+
+
+def test_known_slope(model) -> None:
+    """A steady 1 % per 2 speed-hours is fitted exactly."""
+    now = 0.0
+    model.advance(now, 2.0)
+    for percent in (100, 99, 98, 97):
+        model.add_sample(percent)
+        now = _run(model, now, 1)
+
+    assert model.slope == pytest.approx(-0.5)
+    assert model.runtime == pytest.approx(8.0)
+    assert model.observed == pytest.approx(4.0)
+    # 97 % left at the last sample, 2 speed-hours later it is at 96 %
+    assert model.hours_left() == pytest.approx(96 / 0.5 / 2)
+
+
+def test_replacement_rise_resets(model) -> None:
+    """A jump of the percentage by REPLACEMENT_RISE starts a new fit."""
+    from custom_components.ballu_asp100.filter_model import REPLACEMENT_RISE
+
+    now = 0.0
+    model.advance(now, 1.0)
+    for percent in (40, 39, 38):
+        model.add_sample(percent)
+        now = _run(model, now, 1)
+    assert model.slope is not None
+
+    # A smaller rise is sensor noise, not a new filter
+    assert model.add_sample(38 + REPLACEMENT_RISE - 1)
+    assert model.count == 4
+
+    assert model.add_sample(38 + REPLACEMENT_RISE - 1 + REPLACEMENT_RISE)
+    assert model.count == 1
+    assert model.slope is None
+    assert model.mean_y == 38 + 2 * REPLACEMENT_RISE - 1
+
+
+def test_repeated_percentage_is_ignored(model) -> None:
+    """Only changes of the percentage are samples."""
+    assert model.add_sample(90)
+    assert not model.add_sample(90)
+    assert model.count == 1
+
+
+def test_gap_cap(model) -> None:
+    """Silence longer than MAX_UPDATE_GAP does not count as runtime."""
+    from custom_components.ballu_asp100.filter_model import MAX_UPDATE_GAP
+
+    model.advance(0.0, 3.0)
+    model.advance(MAX_UPDATE_GAP + 1)
+    assert (model.runtime, model.observed) == (0.0, 0.0)
+
+    model.advance(2 * MAX_UPDATE_GAP + 1)
+    assert model.observed == pytest.approx(MAX_UPDATE_GAP / 3600)
+    assert model.runtime == pytest.approx(3 * MAX_UPDATE_GAP / 3600)
+
+
+def test_storage_round_trip(model) -> None:
+    """A stored model predicts the same as the original."""
+    from custom_components.ballu_asp100.filter_model import FilterDepletionModel
+
+    now = 0.0
+    model.advance(now, 1.0)
+    for percent in (80, 79, 78):
+        model.add_sample(percent)
+        now = _run(model, now, 2)
+
+    restored = FilterDepletionModel.from_dict(model.as_dict())
+
+    assert restored.hours_left() == model.hours_left()
+    assert restored.updated == now
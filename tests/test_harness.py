@@ -0,0 +1,36 @@
+"""The test bootstrap must not leak the broker stand-in into later tests."""
+from __future__ import annotations
+
+from benchmark import async_create_hass
+from simulator import InProcessBroker
+
+
+def test_mqtt_restored_after_stop(run, config_dir, tmp_path) -> None:
+    """Stopping the instance puts the MQTT module functions back."""
+    from homeassistant.components import mqtt
+
+    originals = (
+        mqtt.async_subscribe,
+        mqtt.async_publish,
+        mqtt.async_wait_for_mqtt_client,
+    )
+    hass = run(async_create_hass(tmp_path))
+    assert mqtt.async_subscribe == hass.data["benchmark_broker"].async_subscribe
+
+    run(hass.async_stop(force=True))
+    assert (
+        mqtt.async_subscribe,
+        mqtt.async_publish,
+        mqtt.async_wait_for_mqtt_client,
+    ) == originals
+
+
+def test_install_returns_undo(config_dir) -> None:
+    """InProcessBroker.install hands back a callable that undoes it."""
+    from homeassistant.components import mqtt
+
+    original = mqtt.async_publish
+    uninstall = InProcessBroker().install(mqtt)
+    assert mqtt.async_publish != original
+    uninstall()
+    assert mqtt.async_publish == original
@@ -0,0 +1,120 @@
+"""Tests for the in-memory reading history and the get_history service."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from benchmark import DOMAIN, make_entry
+
+
+@pytest.fixture
+def buffer(config_dir):
+    """Return a buffer holding four readings."""
+    from custom_components.ballu_asp100.history import ReadingBuffer
+
+    return ReadingBuffer(4)
+
+
+def test_ring_wraparound(buffer) -> None:
+    """A full buffer overwrites its oldest readings and stays in order."""
+    for second in range(6):
+        buffer.append(float(second), second * 10.0)
+
+    assert len(buffer) == 4
+    assert buffer.window(0) == [(2.0, 20.0), (3.0, 30.0), (4.0, 40.0), (5.0, 50.0)]
+    assert buffer.window(4) == [(4.0, 40.0), (5.0, 50.0)]
+    assert buffer.nbytes == 4 * (4 + 8)
+
+
+def test_summary(buffer) -> None:
+    """The summary covers only readings inside the window."""
+    assert buffer.summary(0) == {"count": 0}
+
+    for second, value in enumerate((600.0, 700.0, 650.0, 800.0, 750.0)):
+        buffer.append(float(second), value)
+
+    assert buffer.summary(2) == {
+        "count": 3,
+        "min": 650.0,
+        "max": 800.0,
+        "mean": 733.33,
+        "first": 650.0,
+        "last": 750.0,
+    }
+
+
+def _device_id(hass, coordinator) -> str:
+    """Return the device registry ID of a coordinator."""
+    from homeassistant.helpers import device_registry as dr
+
+    device = dr.async_get(hass).async_get_device(
+        identifiers={(DOMAIN, coordinator.device_id)}
+    )
+    return device.id
+
+
+def test_get_history(run, hass, broker) -> None:
+    """The service returns the recorded readings of the requested sensors."""
+    entry = make_entry(0)
+    run(hass.config_entries.async_add(entry))
+    run(hass.async_block_till_done())
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    for payload in ("640", "700", "655"):
+        broker.publish(f"{coordinator.state_topic_base}/sensor/co2", payload)
+    broker.publish(f"{coordinator.state_topic_base}/sensor/temperature", "21.5")
+
+    started = time.time()
+    response = run(
+        hass.services.async_call(
+            DOMAIN,
+            "get_history",
+            {"device_id": _device_id(hass, coordinator), "sensors": ["co2"]},
+            blocking=True,
+            return_response=True,
+        )
+    )
+
+    assert list(response) == ["co2"]
+    co2 = response["co2"]
+    assert co2["summary"] == {
+        "count": 3,
+        "min": 640.0,
+        "max": 700.0,
+        "mean": 665.0,
+        "first": 640.0,
+        "last": 655.0,
+    }
+    assert [value for _, value in co2["readings"]] == [640.0, 700.0, 655.0]
+    assert all(abs(timestamp - started) < 60 for timestamp, _ in co2["readings"])
+
+
+def test_get_history_without_readings(run, hass, broker) -> None:
+    """Readings can be left out; both sensors are returned by default."""
+    entry = make_entry(0)
+    run(hass.config_entries.async_add(entry))
+    run(hass.async_block_till_done())
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    broker.publish(f"{coordinator.state_topic_base}/sensor/temperature", "21.5")
+
+    response = run(
+        hass.services.async_call(
+            DOMAIN,
+            "get_history",
+            {"device_id": _device_id(hass, coordinator), "readings": False},
+            blocking=True,
+            return_response=True,
+        )
+    )
+
+    assert response["co2"] == {"summary": {"count": 0}}
+    assert response["temperature"] == {
+        "summary": {
+            "count": 1,
+            "min": 21.5,
+            "max": 21.5,
+            "mean": 21.5,
+            "first": 21.5,
+            "last": 21.5,
+        }
+    }
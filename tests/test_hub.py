@@ -0,0 +1,68 @@
+"""Tests for the fleet hub."""
+from __future__ import annotations
+
+from homeassistant.core import CoreState
+
+from benchmark import DOMAIN, device_id_for, make_entry
+
+
+def _async_setup_hub_entry(hass, entry):
+    """Add an entry and switch it to hub mode."""
+
+    async def async_setup() -> None:
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+        hass.config_entries.async_update_entry(entry, options={"hub_mode": True})
+        await hass.async_block_till_done()
+
+    return async_setup()
+
+
+def test_routes_to_registered_device(run, hass, broker) -> None:
+    """State messages of a registered device reach its coordinator."""
+    entry = make_entry(0)
+    run(_async_setup_hub_entry(hass, entry))
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    broker.publish(f"rusclimate/69/{coordinator.device_id}/state/mode", "1")
+
+    assert coordinator.control_state["mode"] == "1"
+
+
+def test_discovery_survives_last_device_unload(run, hass, broker) -> None:
+    """Unloading the last hub device keeps the wildcard discovery rides on."""
+    entry = make_entry(0)
+    run(_async_setup_hub_entry(hass, entry))
+    subscriptions = broker.subscription_count
+
+    run(hass.config_entries.async_unload(entry.entry_id))
+    hub = hass.data[DOMAIN]["hub"]
+    assert hub.unrouted_listener is not None
+    assert broker.subscription_count == subscriptions
+
+    # Discovery flows are only started once Home Assistant runs
+    hass.set_state(CoreState.running)
+
+    device_id = device_id_for(1)
+    for key in ("temperature", "speed", "mode"):
+        broker.publish(f"rusclimate/69/{device_id}/state/{key}", "1")
+    run(hass.async_block_till_done())
+
+    flows = hass.config_entries.flow.async_progress_by_handler(DOMAIN)
+    assert [flow["context"]["unique_id"] for flow in flows] == [
+        f"ballu_asp100_{device_id}"
+    ]
+
+
+def test_drops_wildcard_without_listener(run, hass, broker) -> None:
+    """Without a discovery listener the last device takes the wildcard along."""
+    entry = make_entry(0)
+    run(_async_setup_hub_entry(hass, entry))
+    hub = hass.data[DOMAIN]["hub"]
+    hub.unrouted_listener = None
+
+    subscriptions = broker.subscription_count
+
+    run(hass.config_entries.async_unload(entry.entry_id))
+
+    assert broker.subscription_count == subscriptions - 1
@@ -0,0 +1,62 @@
+"""Config entry reloads must release every subscription and listener."""
+from __future__ import annotations
+
+import gc
+import tracemalloc
+
+import pytest
+
+from benchmark import DOMAIN, async_enable_all_entities, make_entry
+
+RELOADS = 1000
+# Reloads before the baseline is taken, so caches filled once do not count
+WARMUP_RELOADS = 20
+# Growth of memory allocated by the integration and the broker stand-in
+# over all reloads; a leak of a single object per reload exceeds it
+MEMORY_GROWTH_LIMIT = 16 * 1024
+# Only allocations made by this code are compared: Home Assistant 2024.3
+# itself keeps every unloaded EntityPlatform in hass.data["entity_platform"]
+TRACED_FILES = (
+    tracemalloc.Filter(True, f"*/custom_components/{DOMAIN}/*"),
+    tracemalloc.Filter(True, "*/tools/simulator.py"),
+)
+
+
+@pytest.mark.parametrize("hub_mode", [False, True], ids=["device", "hub"])
+def test_reload_does_not_leak(run, hass, broker, hub_mode: bool) -> None:
+    """Reload an entry many times; subscriptions, listeners and memory stay flat."""
+    entry = make_entry(0)
+    run(hass.config_entries.async_add(entry))
+    hass.config_entries.async_update_entry(entry, options={"hub_mode": hub_mode})
+    run(async_enable_all_entities(hass, entry))
+
+    async def async_reload() -> None:
+        await hass.config_entries.async_reload(entry.entry_id)
+        await hass.async_block_till_done()
+
+    # Traced from the start, so both snapshots hold one live entry
+    tracemalloc.start()
+    try:
+        for _ in range(WARMUP_RELOADS):
+            run(async_reload())
+        gc.collect()
+        subscriptions = broker.subscription_count
+        listeners = hass.data[DOMAIN][entry.entry_id].listener_count
+        before = tracemalloc.take_snapshot()
+
+        for _ in range(RELOADS):
+            run(async_reload())
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    assert listeners > 0
+    assert broker.subscription_count == subscriptions
+    assert hass.data[DOMAIN][entry.entry_id].listener_count == listeners
+    growth = after.filter_traces(TRACED_FILES).compare_to(
+        before.filter_traces(TRACED_FILES), "lineno"
+    )
+    total = sum(stat.size_diff for stat in growth)
+    top = "\n".join(str(stat) for stat in growth[:10])
+    assert total < MEMORY_GROWTH_LIMIT, f"{total} bytes retained:\n{top}"
@@ -0,0 +1,109 @@
+"""Tests for restoring entity state at startup."""
+from __future__ import annotations
+
+from typing import Any
+
+from benchmark import DOMAIN, make_entry
+
+
+def _seed(
+    hass,
+    domain: str,
+    unique_id: str,
+    state: str,
+    attributes: dict[str, Any] | None = None,
+    extra_data: dict[str, Any] | None = None,
+) -> str:
+    """Register an entity and store its state from before a restart."""
+    from homeassistant.helpers import entity_registry as er
+    from homeassistant.helpers.restore_state import StoredState, async_get
+    from homeassistant.util import dt as dt_util
+
+    entity_id = er.async_get(hass).async_get_or_create(
+        domain, DOMAIN, unique_id
+    ).entity_id
+    async_get(hass).last_states[entity_id] = StoredState.from_dict(
+        {
+            "state": {
+                "entity_id": entity_id,
+                "state": state,
+                "attributes": attributes or {},
+            },
+            "extra_data": extra_data,
+            "last_seen": dt_util.utcnow(),
+        }
+    )
+    return entity_id
+
+
+def _seed_device(hass, device_id: str) -> dict[str, str]:
+    """Store the states of a device and return their entity IDs."""
+    prefix = f"ballu_asp100_{device_id}"
+    return {
+        "climate": _seed(
+            hass,
+            "climate",
+            f"{prefix}_climate",
+            "fan_only",
+            {"temperature": 18, "fan_mode": "S3", "preset_mode": "eco"},
+        ),
+        "backlight": _seed(hass, "switch", f"{prefix}_backlight", "on"),
+        "co2": _seed(
+            hass,
+            "sensor",
+            f"{prefix}_co2",
+            "900",
+            extra_data={"native_value": 900, "native_unit_of_measurement": "ppm"},
+        ),
+        "turbo_timer": _seed(
+            hass,
+            "sensor",
+            f"{prefix}_turbo_timer",
+            "2026-01-01T00:00:00+00:00",
+            extra_data={
+                "native_value": {
+                    "__type": "<class 'datetime.datetime'>",
+                    "isoformat": "2026-01-01T00:00:00+00:00",
+                },
+                "native_unit_of_measurement": None,
+            },
+        ),
+    }
+
+
+def _setup(run, hass):
+    """Seed the states of a device, set it up and return it with the IDs."""
+    entry = make_entry(0)
+    entity_ids = _seed_device(hass, entry.data["device_id"])
+    run(hass.config_entries.async_add(entry))
+    run(hass.async_block_till_done())
+    return hass.data[DOMAIN][entry.entry_id], entity_ids
+
+
+def test_restores_last_state(run, hass, broker) -> None:
+    """Entities start from their last state before any device message."""
+    coordinator, entity_ids = _setup(run, hass)
+
+    climate = hass.states.get(entity_ids["climate"])
+    assert climate.state == "fan_only"
+    assert climate.attributes["temperature"] == 18
+    assert climate.attributes["fan_mode"] == "S3"
+    assert climate.attributes["preset_mode"] == "eco"
+    assert hass.states.get(entity_ids["backlight"]).state == "on"
+    assert hass.states.get(entity_ids["co2"]).state == "900"
+    # A countdown from before the restart means nothing now
+    assert hass.states.get(entity_ids["turbo_timer"]).state == "unknown"
+    assert coordinator.restored_entities == 3
+
+
+def test_device_state_wins(run, hass, broker) -> None:
+    """State from the device replaces the restored values."""
+    coordinator, entity_ids = _setup(run, hass)
+
+    broker.publish(f"{coordinator.state_topic_base}/speed", "5")
+    broker.publish(f"{coordinator.state_topic_base}/backlight", "0")
+    broker.publish(f"{coordinator.state_topic_base}/sensor/co2", "640")
+
+    assert hass.states.get(entity_ids["climate"]).attributes["fan_mode"] == "S5"
+    assert hass.states.get(entity_ids["backlight"]).state == "off"
+    assert hass.states.get(entity_ids["co2"]).state == "640"
@@ -0,0 +1,151 @@
+"""Tests for the Ballu ASP-100 sensors."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from benchmark import DOMAIN, async_enable_all_entities, make_entry
+
+# Short aggregation window of the windowed sensors, in seconds
+WINDOW = 0.05
+
+
+def _setup_entry(run, hass, options: dict | None = None):
+    """Set up an entry with every entity enabled and return its coordinator."""
+    entry = make_entry(0)
+    run(hass.config_entries.async_add(entry))
+    if options:
+        hass.config_entries.async_update_entry(entry, options=options)
+    run(async_enable_all_entities(hass, entry))
+    return hass.data[DOMAIN][entry.entry_id]
+
+
+def _entity_id(hass, coordinator, sensor_key: str) -> str:
+    """Return the entity ID of a sensor of the device."""
+    from homeassistant.helpers import entity_registry as er
+
+    return er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"ballu_asp100_{coordinator.device_id}_{sensor_key}"
+    )
+
+
+def _publish_window(run, broker, topic: str, *payloads: str) -> None:
+    """Publish values and wait for the window they fall into to flush."""
+    for payload in payloads:
+        broker.publish(topic, payload)
+    run(asyncio.sleep(WINDOW * 3))
+
+
+def test_windowed_mean_significant_change(run, hass, broker) -> None:
+    """A window mean within significant_change of the state is not written."""
+    coordinator = _setup_entry(run, hass, {"rssi_interval": WINDOW})
+    entity_id = _entity_id(hass, coordinator, "rssi")
+    topic = f"{coordinator.state_topic_base}/diag/rssi"
+
+    # The first value is published right away
+    _publish_window(run, broker, topic, "-61")
+    assert hass.states.get(entity_id).state == "-61.0"
+
+    # Mean -62 is 1 dB away, below the 3 dB threshold
+    _publish_window(run, broker, topic, "-63", "-61")
+    assert hass.states.get(entity_id).state == "-61.0"
+    assert hass.states.get(entity_id).attributes["samples"] == 1
+
+    _publish_window(run, broker, topic, "-66", "-64")
+    state = hass.states.get(entity_id)
+    assert state.state == "-65.0"
+    assert state.attributes["samples"] == 2
+
+
+def test_filter_runtime_accrues_on_tick(run, hass, broker) -> None:
+    """A unit in steady state accrues runtime on every watchdog tick."""
+    coordinator = _setup_entry(run, hass)
+    broker.publish(f"{coordinator.state_topic_base}/mode", "1")
+    broker.publish(f"{coordinator.state_topic_base}/speed", "3")
+    model = run(
+        hass.data[DOMAIN]["filter_models"].async_get_model(coordinator.device_id)
+    )
+    observed, runtime = model.observed, model.runtime
+
+    run(asyncio.sleep(0.01))
+    coordinator.async_tick()
+
+    assert model.observed > observed
+    # Weighted by the fan speed
+    assert model.runtime - runtime == pytest.approx((model.observed - observed) * 3)
+
+
+def test_windowed_min_max_mean(run, hass, broker) -> None:
+    """A window is published once, as its mean with min, max and count."""
+    coordinator = _setup_entry(run, hass, {"gw_latency_interval": WINDOW})
+    entity_id = _entity_id(hass, coordinator, "gw_latency")
+    topic = f"{coordinator.state_topic_base}/diag/gw_latency"
+    _publish_window(run, broker, topic, "35")
+    writes = coordinator.writes_emitted
+
+    _publish_window(run, broker, topic, "40", "52", "46")
+
+    state = hass.states.get(entity_id)
+    assert state.state == "46.0"
+    assert (state.attributes["min"], state.attributes["max"]) == (40.0, 52.0)
+    assert state.attributes["samples"] == 3
+    assert coordinator.writes_emitted == writes + 1
+
+
+def test_windowed_first_value_right_away(run, hass, broker) -> None:
+    """The first value is published without waiting for the window."""
+    coordinator = _setup_entry(run, hass, {"gw_loss_interval": 60})
+    entity_id = _entity_id(hass, coordinator, "gw_loss")
+
+    broker.publish(f"{coordinator.state_topic_base}/diag/gw_loss", "2")
+    broker.publish(f"{coordinator.state_topic_base}/diag/gw_loss", "4")
+
+    state = hass.states.get(entity_id)
+    assert state.state == "2.0"
+    assert state.attributes["samples"] == 1
+
+
+def test_boost_end_drift_tolerance(run, hass, broker) -> None:
+    """The boost end only moves when the countdown drifts from it."""
+    from homeassistant.util import dt as dt_util
+
+    from custom_components.ballu_asp100.sensor import BOOST_DRIFT_TOLERANCE
+
+    coordinator = _setup_entry(run, hass)
+    entity_id = _entity_id(hass, coordinator, "turbo_timer")
+    topic = f"{coordinator.state_topic_base}/time"
+    broker.publish(f"{coordinator.state_topic_base}/mode", "4")
+
+    broker.publish(topic, "600")
+    end = hass.states.get(entity_id).state
+    expected = dt_util.utcnow() + timedelta(seconds=600)
+    assert abs((dt_util.parse_datetime(end) - expected).total_seconds()) <= 1
+
+    # The countdown one second on, and off by the tolerance; one second
+    # is left for the wall clock ticking over between messages
+    for remaining in (599, 600 - BOOST_DRIFT_TOLERANCE + 1):
+        broker.publish(topic, str(remaining))
+        assert hass.states.get(entity_id).state == end
+
+    broker.publish(topic, "500")
+    moved = dt_util.parse_datetime(hass.states.get(entity_id).state)
+    assert (dt_util.parse_datetime(end) - moved).total_seconds() >= 99
+
+
+def test_boost_end_cleared(run, hass, broker) -> None:
+    """The boost end is cleared by a zero countdown and by leaving boost."""
+    coordinator = _setup_entry(run, hass)
+    entity_id = _entity_id(hass, coordinator, "turbo_timer")
+    topic = f"{coordinator.state_topic_base}/time"
+
+    broker.publish(f"{coordinator.state_topic_base}/mode", "4")
+    broker.publish(topic, "300")
+    broker.publish(topic, "0")
+    assert hass.states.get(entity_id).state == "unknown"
+
+    broker.publish(topic, "300")
+    assert hass.states.get(entity_id).state != "unknown"
+    broker.publish(f"{coordinator.state_topic_base}/mode", "1")
+    assert hass.states.get(entity_id).state == "unknown"
@@ -0,0 +1,171 @@
+"""Tests for the fleet services."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from benchmark import DOMAIN, make_entry
+
+
+def _setup_entries(run, hass, count: int) -> list[Any]:
+    """Set up entries and return their coordinators."""
+    entries = [make_entry(index) for index in range(count)]
+    for entry in entries:
+        run(hass.config_entries.async_add(entry))
+    run(hass.async_block_till_done())
+    return [hass.data[DOMAIN][entry.entry_id] for entry in entries]
+
+
+def _device_id(hass, coordinator) -> str:
+    """Return the device registry ID of a coordinator."""
+    from homeassistant.helpers import device_registry as dr
+
+    device = dr.async_get(hass).async_get_device(
+        identifiers={(DOMAIN, coordinator.device_id)}
+    )
+    return device.id
+
+
+def _call(run, hass, service: str, data: dict[str, Any]) -> dict[str, Any]:
+    """Call a service of the integration and return its response."""
+    return run(
+        hass.services.async_call(
+            DOMAIN, service, data, blocking=True, return_response=True
+        )
+    )
+
+
+def _record_commands(broker) -> list[tuple[str, str, str]]:
+    """Record published commands as device ID, control key and payload."""
+    commands: list[tuple[str, str, str]] = []
+
+    def record(message: Any) -> None:
+        # rusclimate/{device_type}/{device_id}/control/{key}
+        parts = message.topic.split("/")
+        commands.append((parts[2], parts[4], message.payload))
+
+    broker.subscribe("rusclimate/+/+/control/#", record)
+    return commands
+
+
+def test_bulk_command_fan_out(run, hass, broker) -> None:
+    """Every loaded device gets the commands, in field order."""
+    coordinators = _setup_entries(run, hass, 3)
+    commands = _record_commands(broker)
+
+    response = _call(
+        run, hass, "bulk_command", {"preset_mode": "comfort", "temperature": 18}
+    )
+
+    assert (response["succeeded"], response["failed"]) == (3, 0)
+    assert sorted(commands) == sorted(
+        (coordinator.device_id, key, payload)
+        for coordinator in coordinators
+        for key, payload in (("mode", "1"), ("temperature", "18"))
+    )
+
+
+def test_bulk_command_collects_errors(
+    run, hass, broker, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Unknown devices and failed publishes are reported per device."""
+    from homeassistant.components import mqtt
+    from homeassistant.exceptions import HomeAssistantError
+
+    good, bad = _setup_entries(run, hass, 2)
+    publish = mqtt.async_publish
+
+    async def async_publish(hass, topic: str, *args: Any, **kwargs: Any) -> None:
+        if bad.device_id in topic:
+            raise HomeAssistantError("broker gone")
+        await publish(hass, topic, *args, **kwargs)
+
+    monkeypatch.setattr(mqtt, "async_publish", async_publish)
+    good_id, bad_id = _device_id(hass, good), _device_id(hass, bad)
+
+    response = _call(
+        run,
+        hass,
+        "bulk_command",
+        {"device_id": [good_id, bad_id, "unknown"], "backlight": True},
+    )
+
+    assert (response["succeeded"], response["failed"]) == (1, 2)
+    assert response["devices"] == {
+        good_id: {"success": True},
+        bad_id: {"success": False, "error": "broker gone"},
+        "unknown": {"success": False, "error": "Unknown device: unknown"},
+    }
+
+
+def test_bulk_command_concurrency(
+    run, hass, broker, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """No more devices are commanded at once than the concurrency allows."""
+    from homeassistant.components import mqtt
+
+    _setup_entries(run, hass, 6)
+    publish = mqtt.async_publish
+    active = peak = 0
+
+    async def async_publish(*args: Any, **kwargs: Any) -> None:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0)
+        await publish(*args, **kwargs)
+        active -= 1
+
+    monkeypatch.setattr(mqtt, "async_publish", async_publish)
+
+    response = _call(run, hass, "bulk_command", {"fan_mode": "S2", "concurrency": 2})
+
+    assert response["succeeded"] == 6
+    assert peak == 2
+
+
+def _publish_state(broker, coordinator, **state: str) -> None:
+    """Publish control state of a device."""
+    for key, payload in state.items():
+        broker.publish(f"{coordinator.state_topic_base}/{key}", payload)
+
+
+def test_restore_state_publishes_only_differences(run, hass, broker) -> None:
+    """Restoring a snapshot publishes only the keys that changed since."""
+    (coordinator,) = _setup_entries(run, hass, 1)
+    device_id = _device_id(hass, coordinator)
+    _publish_state(broker, coordinator, mode="1", speed="3", temperature="20")
+
+    snapshot = _call(run, hass, "snapshot_state", {"name": "evening"})
+    assert snapshot == {device_id: {"mode": "1", "speed": "3", "temperature": "20"}}
+
+    # A float echo of the same value is not a difference
+    _publish_state(broker, coordinator, mode="4", speed="5", temperature="20.0")
+    commands = _record_commands(broker)
+    response = _call(run, hass, "restore_state", {"name": "evening"})
+
+    assert response["devices"] == {
+        device_id: {"success": True, "published": ["mode", "speed"]}
+    }
+    assert [command[1:] for command in commands] == [("mode", "1"), ("speed", "3")]
+
+
+def test_restore_state_missing_snapshot(run, hass, broker) -> None:
+    """A device without the named snapshot fails on its own."""
+    first, second = _setup_entries(run, hass, 2)
+    _publish_state(broker, first, mode="1")
+    _call(run, hass, "snapshot_state", {"device_id": [_device_id(hass, first)]})
+    _publish_state(broker, first, mode="5")
+
+    response = _call(run, hass, "restore_state", {})
+
+    assert response["devices"][_device_id(hass, first)] == {
+        "success": True,
+        "published": ["mode"],
+    }
+    assert response["devices"][_device_id(hass, second)] == {
+        "success": False,
+        "error": "No snapshot named default",
+    }
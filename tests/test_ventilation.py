@@ -0,0 +1,133 @@
+"""Tests for the built-in CO2 ventilation controller."""
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from benchmark import DOMAIN, make_entry
+
+OPTIONS = {
+    "co2_control": True,
+    "co2_target": 800,
+    "co2_hysteresis": 100,
+    "co2_min_speed": 2,
+    "co2_max_speed": 4,
+    "co2_step_interval": 0,
+    "co2_boost_level": 1500,
+}
+
+
+def _setup_controller(run, hass, broker, **options):
+    """Set up a controlled device and return its coordinator and commands."""
+    entry = make_entry(0)
+    run(hass.config_entries.async_add(entry))
+    hass.config_entries.async_update_entry(entry, options={**OPTIONS, **options})
+    run(hass.async_block_till_done())
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    commands: list[tuple[str, str]] = []
+    broker.subscribe(
+        f"{coordinator.command_topic_base}/#",
+        lambda message: commands.append(
+            (message.topic.rsplit("/", 1)[1], message.payload)
+        ),
+    )
+    return coordinator, commands
+
+
+def _publish(run, hass, broker, coordinator, **state: int) -> None:
+    """Publish device state and let the controller react."""
+    for key, value in state.items():
+        key = "sensor/co2" if key == "co2" else key
+        broker.publish(f"{coordinator.state_topic_base}/{key}", str(value))
+    run(hass.async_block_till_done())
+
+
+def test_hysteresis_band(run, hass, broker) -> None:
+    """Speed only changes once CO2 leaves the band around the target."""
+    coordinator, commands = _setup_controller(run, hass, broker)
+
+    _publish(run, hass, broker, coordinator, mode=1, speed=3, co2=890)
+    _publish(run, hass, broker, coordinator, co2=710)
+    assert commands == []
+
+    _publish(run, hass, broker, coordinator, co2=900)
+    _publish(run, hass, broker, coordinator, speed=4, co2=700)
+    assert commands == [("speed", "4"), ("speed", "3")]
+    assert coordinator.ventilation.speed_changes == 2
+
+
+def test_speed_bounds(run, hass, broker) -> None:
+    """Speed steps stop at the configured minimum and maximum."""
+    coordinator, commands = _setup_controller(run, hass, broker)
+
+    _publish(run, hass, broker, coordinator, mode=1, speed=4, co2=1200)
+    _publish(run, hass, broker, coordinator, speed=2, co2=500)
+    assert commands == []
+
+    _publish(run, hass, broker, coordinator, speed=7, co2=1200)
+    assert commands == [("speed", "4")]
+
+
+def test_step_interval(run, hass, broker) -> None:
+    """Only one speed change is made per step interval."""
+    coordinator, commands = _setup_controller(
+        run, hass, broker, co2_step_interval=60
+    )
+
+    _publish(run, hass, broker, coordinator, mode=1, speed=2, co2=1000)
+    _publish(run, hass, broker, coordinator, speed=3, co2=1000)
+
+    assert commands == [("speed", "3")]
+    assert coordinator.ventilation.speed_changes == 1
+    assert coordinator.ventilation.rate_limited == 1
+
+
+def test_boost_entry_and_exit(run, hass, broker) -> None:
+    """The controller boosts at the boost level and ends its own boost."""
+    coordinator, commands = _setup_controller(run, hass, broker)
+
+    _publish(run, hass, broker, coordinator, mode=1, speed=3, co2=1600)
+    assert commands == [("mode", "4")]
+    assert coordinator.ventilation.boosts == 1
+
+    # Still above the band, the boost goes on
+    _publish(run, hass, broker, coordinator, mode=4, co2=1000)
+    assert commands == [("mode", "4")]
+
+    _publish(run, hass, broker, coordinator, co2=850)
+    assert commands == [("mode", "4"), ("mode", "1")]
+
+
+def test_user_boost_is_left_alone(run, hass, broker) -> None:
+    """A boost started by the user is not ended by the controller."""
+    coordinator, commands = _setup_controller(run, hass, broker)
+
+    _publish(run, hass, broker, coordinator, mode=4, speed=3, co2=600)
+
+    assert commands == []
+
+
+def test_failed_publish_is_not_counted(
+    run, hass, broker, monkeypatch: pytest.MonkeyPatch, caplog
+) -> None:
+    """A command the broker did not take is logged, not counted as a change."""
+    from homeassistant.components import mqtt
+    from homeassistant.exceptions import HomeAssistantError
+
+    coordinator, commands = _setup_controller(run, hass, broker)
+
+    async def async_publish(*args, **kwargs) -> None:
+        raise HomeAssistantError("broker gone")
+
+    monkeypatch.setattr(mqtt, "async_publish", async_publish)
+    with caplog.at_level(logging.WARNING):
+        _publish(run, hass, broker, coordinator, mode=1, speed=3, co2=1000)
+        _publish(run, hass, broker, coordinator, co2=1600)
+
+    controller = coordinator.ventilation
+    assert (controller.speed_changes, controller.boosts) == (0, 0)
+    assert controller.publish_failures == 2
+    assert "Could not set speed to 4" in caplog.text
+    assert "never retrieved" not in caplog.text
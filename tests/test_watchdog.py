@@ -0,0 +1,75 @@
+"""Tests for the fleet availability watchdog."""
+from __future__ import annotations
+
+from benchmark import DOMAIN, make_entry
+
+STALE_TIMEOUT = 60
+
+
+def _setup_entries(run, hass, count: int) -> list:
+    """Set up entries with a short stale timeout and return their coordinators."""
+    entries = [make_entry(index) for index in range(count)]
+    for entry in entries:
+        run(hass.config_entries.async_add(entry))
+        hass.config_entries.async_update_entry(
+            entry, options={"stale_timeout": STALE_TIMEOUT}
+        )
+    run(hass.async_block_till_done())
+    return [hass.data[DOMAIN][entry.entry_id] for entry in entries]
+
+
+def _climate_state(hass, coordinator) -> str:
+    """Return the state of the climate entity of a device."""
+    from homeassistant.helpers import entity_registry as er
+
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "climate", DOMAIN, f"ballu_asp100_{coordinator.device_id}_climate"
+    )
+    return hass.states.get(entity_id).state
+
+
+def _advance(clock, seconds: int) -> None:
+    """Let the watchdog tick through ``seconds``."""
+    from custom_components.ballu_asp100.watchdog import WATCHDOG_INTERVAL
+
+    step = WATCHDOG_INTERVAL.total_seconds()
+    for _ in range(int(seconds // step)):
+        clock.advance(step)
+
+
+def test_silent_device_becomes_unavailable(run, hass, broker, clock) -> None:
+    """A device silent for longer than its stale timeout goes unavailable."""
+    silent, talking = _setup_entries(run, hass, 2)
+
+    for _ in range(4):
+        broker.publish(f"{talking.state_topic_base}/mode", "1")
+        _advance(clock, STALE_TIMEOUT / 2)
+
+    assert not silent.available
+    assert _climate_state(hass, silent) == "unavailable"
+    assert talking.available
+    assert _climate_state(hass, talking) != "unavailable"
+
+
+def test_device_recovers_with_next_message(run, hass, broker, clock) -> None:
+    """The first message after a silence makes the device available again."""
+    (coordinator,) = _setup_entries(run, hass, 1)
+    _advance(clock, STALE_TIMEOUT * 2)
+    assert _climate_state(hass, coordinator) == "unavailable"
+
+    broker.publish(f"{coordinator.state_topic_base}/mode", "1")
+
+    assert coordinator.available
+    assert _climate_state(hass, coordinator) == "fan_only"
+
+
+def test_no_tick_while_unavailable(run, hass, broker, clock) -> None:
+    """Tick listeners only run for devices that are available."""
+    (coordinator,) = _setup_entries(run, hass, 1)
+    ticks = []
+    coordinator.async_add_tick_listener(lambda: ticks.append(coordinator.available))
+
+    _advance(clock, STALE_TIMEOUT * 3)
+
+    assert ticks and all(ticks)
+    assert not coordinator.available
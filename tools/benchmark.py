@@ -0,0 +1,508 @@
+"""Benchmark suite for the Ballu ASP-100 integration.
+
+Measures, against the in-process broker from ``simulator.py`` installed in
+place of ``homeassistant.components.mqtt``:
+
+* per-message cost of every state handler (each ``SENSOR_TYPES`` entry, the
+  climate, switch and select handlers), for changed and repeated values;
+* wall time of ``async_setup_entry`` for 1, 50 and 500 config entries;
+* command publish throughput, through the publisher and through services;
+* hub routing cost for 10 to 1000 devices, codec decode cost per state key
+  and discovery engine throughput on a synthetic topic flood;
+* ``-X importtime`` cost of the modules needed to set up an entry, on top of
+  what Home Assistant has already loaded, and whether any on-demand module
+  (config flow, discovery, hub, ...) was pulled in eagerly.
+
+Results are written as JSON so runs of different versions can be compared::
+
+    python tools/benchmark.py --output before.json
+    python tools/benchmark.py --output after.json --compare before.json
+
+``--check-budget`` exits non-zero when the import cost, the eagerly loaded
+on-demand modules or the setup time of 500 entries exceed their budget; the
+same budgets fail the test run in ``tests/test_budget.py``.
+
+The same measurements run as a pytest-benchmark suite in
+``tests/test_benchmark.py``, which uses the helpers of this module.
+
+Requires Home Assistant to be installed; no network broker is used.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable
+import inspect
+import itertools
+import json
+from pathlib import Path
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from simulator import InProcessBroker, ReceiveMessage, SimulatedDevice  # noqa: E402
+
+DOMAIN = "ballu_asp100"
+SETUP_ENTRY_COUNTS = (1, 50, 500)
+HUB_DEVICE_COUNTS = (10, 100, 1000)
+DISCOVERY_DEVICE_COUNTS = (1000, 5000)
+# Relative slowdown reported as a regression by --compare
+REGRESSION_THRESHOLD = 1.2
+
+# Modules Home Assistant has loaded before it sets up the integration
+HA_PRELOADED = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.restore_state",
+    "homeassistant.components.mqtt",
+    "homeassistant.components.climate",
+    "homeassistant.components.select",
+    "homeassistant.components.sensor",
+    "homeassistant.components.switch",
+)
+# Integration modules imported to set up a config entry
+SETUP_MODULES = ("", ".climate", ".select", ".sensor", ".switch")
+# Integration modules that must only be imported on demand
+ON_DEMAND_MODULES = (
+    ".config_flow",
+    ".discovery",
+    ".hub",
+    ".manual_discovery",
+    ".snapshots",
+    ".ventilation",
+)
+# Budgets enforced by --check-budget
+IMPORT_BUDGET_MS = 50.0
+SETUP_500_BUDGET_S = 10.0
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+# Two payloads per state key: alternating them defeats change suppression
+STATE_PAYLOADS: dict[str, tuple[str, str]] = {
+    "temperature": ("20", "21"),
+    "speed": ("2", "3"),
+    "mode": ("1", "5"),
+    "amount": ("0", "2"),
+    "volume": ("0", "1"),
+    "backlight": ("0", "1"),
+    "expendables": ("[85]", "[84]"),
+    "time": ("125", "124"),
+    "sensor/temperature": ("21.5", "21.6"),
+    "sensor/co2": ("640", "655"),
+    "diag/rssi": ("-61", "-63"),
+    "diag/mqtt_latency": ("120", "140"),
+    "diag/gw_latency": ("35", "40"),
+    "diag/gw_loss": ("0", "1"),
+}
+
+
+def per_call_ns(func: Callable[[], Any], number: int, repeat: int = 5) -> float:
+    """Return the best per-call time of ``func`` in nanoseconds."""
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def device_id_for(index: int) -> str:
+    """Return a deterministic 32-hex device ID."""
+    return f"{index:032x}"
+
+
+async def async_create_hass(config_dir: Path) -> Any:
+    """Create a bare Home Assistant instance with the broker stand-in."""
+    # core before loader, as Home Assistant imports them; they import each other
+    from homeassistant.core import HomeAssistant, callback
+    from homeassistant import loader
+    from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+    from homeassistant.components import mqtt
+    from homeassistant.config_entries import ConfigEntries
+    from homeassistant.helpers import entity, restore_state, translation
+
+    try:
+        hass = HomeAssistant(str(config_dir))
+    except TypeError:
+        hass = HomeAssistant()
+        hass.config.config_dir = str(config_dir)
+    if hasattr(loader, "async_setup"):
+        loader.async_setup(hass)
+    # Caches the entity platform uses when entities are added
+    translation.async_setup(hass)
+    entity.async_setup(hass)
+
+    # Registries in dependency order, skipping ones this version lacks
+    for name in (
+        "category_registry",
+        "floor_registry",
+        "label_registry",
+        "area_registry",
+        "device_registry",
+        "entity_registry",
+    ):
+        try:
+            module = __import__(f"homeassistant.helpers.{name}", fromlist=["_"])
+        except ImportError:
+            continue
+        await module.async_load(hass)
+
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    # Last states for RestoreEntity, read when entities are added
+    await restore_state.async_load(hass)
+
+    broker = InProcessBroker()
+    uninstall = broker.install(mqtt)
+
+    async def wait_for_client(hass: Any) -> bool:
+        return True
+
+    wait_for_mqtt_client = mqtt.async_wait_for_mqtt_client
+    mqtt.async_wait_for_mqtt_client = wait_for_client
+
+    @callback
+    def restore_mqtt(event: Any) -> None:
+        """Put the MQTT module back once this instance has stopped."""
+        uninstall()
+        mqtt.async_wait_for_mqtt_client = wait_for_mqtt_client
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, restore_mqtt)
+    # The broker stands in for the MQTT integration dependency
+    hass.config.components.add("mqtt")
+    hass.data["benchmark_broker"] = broker
+    return hass
+
+
+def make_entry(index: int) -> Any:
+    """Return a config entry for a simulated device."""
+    from homeassistant.config_entries import ConfigEntry
+
+    device_id = device_id_for(index)
+    values = {
+        "version": 1,
+        "minor_version": 1,
+        "domain": DOMAIN,
+        "title": f"Ballu {index}",
+        "data": {
+            "device_id": device_id,
+            "device_type": "69",
+            "name": f"Ballu {index}",
+        },
+        "options": {},
+        "source": "user",
+        "unique_id": f"ballu_asp100_{device_id}",
+        "discovery_keys": {},
+    }
+    parameters = inspect.signature(ConfigEntry).parameters
+    return ConfigEntry(**{key: value for key, value in values.items() if key in parameters})
+
+
+async def async_bench_setup(config_dir: Path) -> dict[str, float]:
+    """Measure async_setup_entry wall time for growing numbers of entries."""
+    results = {}
+    for count in SETUP_ENTRY_COUNTS:
+        hass = await async_create_hass(config_dir / f"setup_{count}")
+        entries = [make_entry(index) for index in range(count)]
+        started = time.perf_counter()
+        for entry in entries:
+            await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+        elapsed = time.perf_counter() - started
+        results[f"setup.entries_{count}.total_s"] = elapsed
+        results[f"setup.entries_{count}.per_entry_ms"] = elapsed / count * 1000
+        await hass.async_stop(force=True)
+    return results
+
+
+async def async_enable_all_entities(hass: Any, entry: Any) -> None:
+    """Enable entities that are disabled by default and reload the entry."""
+    from homeassistant.helpers import entity_registry as er
+
+    registry = er.async_get(hass)
+    for entity_entry in er.async_entries_for_config_entry(registry, entry.entry_id):
+        if entity_entry.disabled_by is not None:
+            registry.async_update_entity(entity_entry.entity_id, disabled_by=None)
+    await hass.config_entries.async_reload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def async_bench_handlers(config_dir: Path, number: int) -> dict[str, float]:
+    """Measure per-message cost of every state key through the dispatcher."""
+    hass = await async_create_hass(config_dir / "handlers")
+    broker: InProcessBroker = hass.data["benchmark_broker"]
+    entry = make_entry(0)
+    await hass.config_entries.async_add(entry)
+    await hass.async_block_till_done()
+    await async_enable_all_entities(hass, entry)
+
+    state_topic_base = f"rusclimate/69/{entry.data['device_id']}/state"
+    results = {}
+    for key, payloads in STATE_PAYLOADS.items():
+        topic = f"{state_topic_base}/{key}"
+        changing = itertools.cycle(payloads)
+        results[f"handler.{key}.changed_ns"] = per_call_ns(
+            lambda: broker.publish(topic, next(changing)), number
+        )
+        results[f"handler.{key}.repeated_ns"] = per_call_ns(
+            lambda: broker.publish(topic, payloads[0]), number
+        )
+    await hass.async_stop(force=True)
+    return results
+
+
+async def async_bench_commands(config_dir: Path, number: int) -> dict[str, float]:
+    """Measure command publish throughput with a simulated echoing device."""
+    from custom_components.ballu_asp100 import commands
+
+    # Measure the publisher itself, not the per-device rate limit
+    command_rate = commands.COMMAND_RATE
+    commands.COMMAND_RATE = 1e9
+    try:
+        hass = await async_create_hass(config_dir / "commands")
+        entry = make_entry(0)
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+    finally:
+        # Only read when a publisher is created
+        commands.COMMAND_RATE = command_rate
+    broker: InProcessBroker = hass.data["benchmark_broker"]
+    device = SimulatedDevice(broker, entry.data["device_id"])
+    device.start()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    results = {}
+
+    started = time.perf_counter()
+    for index in range(number):
+        await coordinator.commands.async_publish("amount", str(index % 6))
+    elapsed = time.perf_counter() - started
+    results["commands.publisher.per_s"] = number / elapsed
+
+    switch_ids = [state.entity_id for state in hass.states.async_all("switch")]
+    started = time.perf_counter()
+    for index in range(number):
+        await hass.services.async_call(
+            "switch",
+            "turn_on" if index % 2 else "turn_off",
+            {"entity_id": switch_ids[0]},
+            blocking=True,
+        )
+    elapsed = time.perf_counter() - started
+    results["commands.service.per_s"] = number / elapsed
+    results["commands.device_received"] = device.commands_received
+
+    device.stop()
+    await hass.async_stop(force=True)
+    return results
+
+
+async def async_bench_hub(number: int) -> dict[str, float]:
+    """Measure hub routing cost per message as the fleet grows."""
+    from types import SimpleNamespace
+
+    from custom_components.ballu_asp100.hub import BalluASP100Hub
+    from homeassistant.components import mqtt
+
+    results = {}
+    for count in HUB_DEVICE_COUNTS:
+        uninstall = InProcessBroker().install(mqtt)
+        hub = BalluASP100Hub(None)
+        messages = []
+        for index in range(count):
+            device_id = device_id_for(index)
+            await hub.async_register(
+                SimpleNamespace(
+                    device_type="69",
+                    device_id=device_id,
+                    async_dispatch=lambda key, message: None,
+                )
+            )
+            messages.append(
+                ReceiveMessage(
+                    f"rusclimate/69/{device_id}/state/sensor/co2",
+                    "640",
+                    0,
+                    False,
+                    "rusclimate/+/+/state/#",
+                    0.0,
+                )
+            )
+        cycle = itertools.cycle(messages)
+        results[f"hub.devices_{count}.route_ns"] = per_call_ns(
+            lambda: hub._message_received(next(cycle)), number
+        )
+        uninstall()
+    return results
+
+
+def bench_codec(number: int) -> dict[str, float]:
+    """Measure decode cost per state key."""
+    from custom_components.ballu_asp100.codec import decode
+
+    return {
+        f"codec.{key}.decode_ns": per_call_ns(
+            lambda: decode(key, payloads[0]), number
+        )
+        for key, payloads in STATE_PAYLOADS.items()
+    }
+
+
+def bench_discovery() -> dict[str, float]:
+    """Measure discovery engine throughput on a flood of synthetic topics."""
+    from custom_components.ballu_asp100.discovery import DiscoveryEngine
+
+    results = {}
+    for count in DISCOVERY_DEVICE_COUNTS:
+        topics = [
+            f"rusclimate/69/{device_id_for(index)}/state/{key}"
+            for _ in range(3)
+            for index in range(count)
+            for key in ("temperature", "speed", "mode", "sensor/co2", "diag/gw_loss")
+        ]
+        engine = DiscoveryEngine()
+        started = time.perf_counter()
+        for topic in topics:
+            engine.feed(topic)
+        elapsed = time.perf_counter() - started
+        results[f"discovery.devices_{count}.topics_per_s"] = len(topics) / elapsed
+        results[f"discovery.devices_{count}.found"] = len(engine.results())
+    return results
+
+
+def bench_import() -> dict[str, float]:
+    """Measure ``-X importtime`` of the setup modules in a fresh interpreter."""
+    package = f"custom_components.{DOMAIN}"
+    statements = [f"import {module}" for module in HA_PRELOADED]
+    statements += [f"import {package}{module}" for module in SETUP_MODULES]
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(statements)],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative_us: dict[str, int] = {}
+    self_us: dict[str, int] = {}
+    for line in process.stderr.splitlines():
+        if (match := _IMPORTTIME_LINE.match(line)) is None:
+            continue
+        own, total, indent, name = match.groups()
+        self_us[name] = int(own)
+        if not indent:
+            # Top-level imports only, nested ones are part of their parent
+            cumulative_us[name] = int(total)
+
+    results = {
+        f"import.{module.lstrip('.') or '__init__'}.cumulative_ms": (
+            cumulative_us.get(f"{package}{module}", 0) / 1000
+        )
+        for module in SETUP_MODULES
+    }
+    results["import.setup_modules.total_ms"] = sum(results.values())
+    for name, own in self_us.items():
+        if name.startswith(package):
+            results[f"import.{name[len(package) + 1:] or '__init__'}.self_ms"] = (
+                own / 1000
+            )
+    results["import.on_demand_loaded"] = sum(
+        1 for module in ON_DEMAND_MODULES if f"{package}{module}" in self_us
+    )
+    return results
+
+
+def check_budget(results: dict[str, float]) -> bool:
+    """Print budget checks and return True if any budget is exceeded."""
+    checks = [
+        ("import.setup_modules.total_ms", IMPORT_BUDGET_MS),
+        ("import.on_demand_loaded", 0),
+        ("setup.entries_500.total_s", SETUP_500_BUDGET_S),
+    ]
+    exceeded = False
+    for name, budget in checks:
+        if (value := results.get(name)) is None:
+            print(f"{name:55} not measured")
+            continue
+        marker = ""
+        if value > budget:
+            marker = "  OVER BUDGET"
+            exceeded = True
+        print(f"{name:55} {value:14.2f} / {budget:10.2f}{marker}")
+    return exceeded
+
+
+def compare(results: dict[str, float], baseline_path: Path) -> bool:
+    """Print a comparison against a baseline and return True on regression."""
+    baseline = json.loads(baseline_path.read_text())["results"]
+    regressed = False
+    for name, value in sorted(results.items()):
+        if (before := baseline.get(name)) in (None, 0):
+            continue
+        # Throughput metrics regress when they drop, timings when they grow
+        ratio = before / value if name.endswith("per_s") else value / before
+        marker = ""
+        if ratio > REGRESSION_THRESHOLD:
+            marker = "  REGRESSION"
+            regressed = True
+        print(f"{name:55} {before:14.1f} -> {value:14.1f}  x{ratio:.2f}{marker}")
+    return regressed
+
+
+async def async_main(args: argparse.Namespace) -> int:
+    """Run the selected benchmarks."""
+    results: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_dir = Path(temp_dir)
+        (config_dir / "custom_components").symlink_to(REPO_ROOT / "custom_components")
+        sys.path.insert(0, str(config_dir))
+
+        results.update(bench_import())
+        results.update(bench_codec(args.number))
+        results.update(bench_discovery())
+        results.update(await async_bench_hub(args.number))
+        results.update(await async_bench_handlers(config_dir, args.number))
+        results.update(await async_bench_commands(config_dir, args.commands))
+        if not args.skip_setup:
+            results.update(await async_bench_setup(config_dir))
+
+    manifest = json.loads(
+        (REPO_ROOT / "custom_components" / DOMAIN / "manifest.json").read_text()
+    )
+    report = {
+        "version": manifest["version"],
+        "python": platform.python_version(),
+        "timestamp": time.time(),
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2, sort_keys=True))
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    failed = False
+    if args.compare:
+        failed = compare(results, Path(args.compare))
+    if args.check_budget:
+        failed = check_budget(results) or failed
+    return 1 if failed else 0
+
+
+def main() -> None:
+    """Parse arguments and run the suite."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--commands", type=int, default=500)
+    parser.add_argument("--skip-setup", action="store_true")
+    parser.add_argument("--check-budget", action="store_true")
+    sys.exit(asyncio.run(async_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
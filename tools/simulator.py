@@ -0,0 +1,384 @@
+"""Ballu ASP-100 fleet simulator and in-process MQTT broker stand-in.
+
+Emulates N units on the ``rusclimate/{type}/{id}/state/...`` and
+``control/...`` topic layout and runs them against an in-process broker,
+so the integration can be driven with thousands of messages per second
+without real units or a network broker.
+
+The broker exposes ``async_subscribe`` and ``async_publish`` with the same
+signatures as ``homeassistant.components.mqtt``; ``InProcessBroker.install``
+swaps them into that module so the real platform code talks to the fleet::
+
+    broker = InProcessBroker()
+    uninstall = broker.install(homeassistant.components.mqtt)
+    fleet = FleetSimulator(broker, devices=500, telemetry_interval=1.0)
+    await fleet.async_start()
+    ...
+    uninstall()
+
+Run standalone to measure raw broker and simulator throughput::
+
+    python tools/simulator.py --devices 1000 --duration 10
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+import random
+import time
+from typing import Any
+
+DEVICE_TYPE = "69"
+# Turbo mode (boost) countdown in seconds started by ``control/mode`` = 4
+BOOST_DURATION = 600
+MODE_BOOST = 4
+
+
+@dataclass(frozen=True)
+class ReceiveMessage:
+    """Message delivered to subscribers, shaped like the HA MQTT message."""
+
+    topic: str
+    payload: str
+    qos: int
+    retain: bool
+    subscribed_topic: str
+    timestamp: float
+
+
+def topic_matches(topic_filter: str, topic: str) -> bool:
+    """Return True if an MQTT topic matches a filter with ``+``/``#``."""
+    filter_parts = topic_filter.split("/")
+    topic_parts = topic.split("/")
+    for index, part in enumerate(filter_parts):
+        if part == "#":
+            return True
+        if index >= len(topic_parts):
+            return False
+        if part != "+" and part != topic_parts[index]:
+            return False
+    return len(filter_parts) == len(topic_parts)
+
+
+class _TopicNode:
+    """Level of the subscription trie."""
+
+    __slots__ = ("children", "callbacks")
+
+    def __init__(self) -> None:
+        """Initialize the node."""
+        self.children: dict[str, _TopicNode] = {}
+        self.callbacks: list[tuple[str, Callable[[ReceiveMessage], Any]]] = []
+
+
+class InProcessBroker:
+    """Minimal MQTT broker stand-in delivering messages on the event loop.
+
+    Subscriptions are kept in a trie keyed by topic level, so matching a
+    message costs one walk over its levels no matter how many devices
+    subscribed.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the broker."""
+        self._root = _TopicNode()
+        self._retained: dict[str, str] = {}
+        self.subscription_count = 0
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(
+        self, topic_filter: str, msg_callback: Callable[[ReceiveMessage], Any]
+    ) -> Callable[[], None]:
+        """Subscribe to a topic filter and return the unsubscribe callable."""
+        node = self._root
+        for level in topic_filter.split("/"):
+            node = node.children.setdefault(level, _TopicNode())
+        entry = (topic_filter, msg_callback)
+        node.callbacks.append(entry)
+        self.subscription_count += 1
+
+        def unsubscribe() -> None:
+            if entry in node.callbacks:
+                node.callbacks.remove(entry)
+                self.subscription_count -= 1
+
+        for topic, payload in list(self._retained.items()):
+            if topic_matches(topic_filter, topic):
+                self._deliver(topic_filter, msg_callback, topic, payload, True)
+        return unsubscribe
+
+    def publish(
+        self, topic: str, payload: str, qos: int = 0, retain: bool = False
+    ) -> None:
+        """Publish a message to all matching subscribers."""
+        self.published += 1
+        if retain:
+            self._retained[topic] = payload
+        nodes = [self._root]
+        for level in topic.split("/"):
+            next_nodes = []
+            for node in nodes:
+                if (multi := node.children.get("#")) is not None:
+                    for topic_filter, msg_callback in multi.callbacks:
+                        self._deliver(
+                            topic_filter, msg_callback, topic, payload, False, qos
+                        )
+                if (exact := node.children.get(level)) is not None:
+                    next_nodes.append(exact)
+                if (single := node.children.get("+")) is not None:
+                    next_nodes.append(single)
+            if not next_nodes:
+                return
+            nodes = next_nodes
+        for node in nodes:
+            for topic_filter, msg_callback in node.callbacks:
+                self._deliver(
+                    topic_filter, msg_callback, topic, payload, False, qos
+                )
+
+    def _deliver(
+        self,
+        topic_filter: str,
+        msg_callback: Callable[[ReceiveMessage], Any],
+        topic: str,
+        payload: str,
+        retain: bool,
+        qos: int = 0,
+    ) -> None:
+        """Hand a message to a subscriber."""
+        self.delivered += 1
+        result = msg_callback(
+            ReceiveMessage(topic, payload, qos, retain, topic_filter, time.time())
+        )
+        if asyncio.iscoroutine(result):
+            asyncio.get_running_loop().create_task(result)
+
+    async def async_subscribe(
+        self,
+        hass: Any,
+        topic: str,
+        msg_callback: Callable[[ReceiveMessage], Any],
+        qos: int = 0,
+        encoding: str | None = "utf-8",
+    ) -> Callable[[], None]:
+        """Drop-in for ``homeassistant.components.mqtt.async_subscribe``."""
+        return self.subscribe(topic, msg_callback)
+
+    async def async_publish(
+        self,
+        hass: Any,
+        topic: str,
+        payload: Any,
+        qos: int = 0,
+        retain: bool = False,
+        encoding: str | None = "utf-8",
+    ) -> None:
+        """Drop-in for ``homeassistant.components.mqtt.async_publish``."""
+        self.publish(topic, str(payload), qos, retain)
+
+    def install(self, mqtt_module: Any) -> Callable[[], None]:
+        """Route an MQTT module's subscribe/publish through this broker.
+
+        Returns a callable that puts the original functions back.
+        """
+        originals = (mqtt_module.async_subscribe, mqtt_module.async_publish)
+        mqtt_module.async_subscribe = self.async_subscribe
+        mqtt_module.async_publish = self.async_publish
+
+        def uninstall() -> None:
+            mqtt_module.async_subscribe, mqtt_module.async_publish = originals
+
+        return uninstall
+
+
+class SimulatedDevice:
+    """One ASP-100 unit: control commands are applied and echoed as state."""
+
+    def __init__(
+        self, broker: InProcessBroker, device_id: str, device_type: str = DEVICE_TYPE
+    ) -> None:
+        """Initialize the device."""
+        self.broker = broker
+        self.device_id = device_id
+        self.state_topic_base = f"rusclimate/{device_type}/{device_id}/state"
+        self.command_topic_base = f"rusclimate/{device_type}/{device_id}/control"
+        self.controls: dict[str, int] = {
+            "mode": 1,
+            "speed": 3,
+            "temperature": 20,
+            "amount": 0,
+            "volume": 1,
+            "backlight": 0,
+        }
+        self.co2 = random.uniform(450, 900)
+        self.air_temperature = random.uniform(18, 24)
+        self.filter_life = random.randint(40, 100)
+        self.boost_remaining = 0
+        self.commands_received = 0
+        self._unsubscribe: Callable[[], None] | None = None
+
+    def start(self) -> None:
+        """Listen for commands and publish the full initial state."""
+        self._unsubscribe = self.broker.subscribe(
+            f"{self.command_topic_base}/+", self._command_received
+        )
+        for key, value in self.controls.items():
+            self.publish_state(key, value)
+        self.publish_telemetry()
+        self.publish_diagnostics()
+
+    def stop(self) -> None:
+        """Stop listening for commands."""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def publish_state(self, key: str, value: Any) -> None:
+        """Publish a value on ``state/<key>``."""
+        self.broker.publish(f"{self.state_topic_base}/{key}", str(value))
+
+    def publish_telemetry(self) -> None:
+        """Publish sensor readings with a small random walk."""
+        self.co2 = min(max(self.co2 + random.uniform(-15, 15), 400), 2000)
+        self.air_temperature += random.uniform(-0.1, 0.1)
+        self.publish_state("sensor/co2", int(self.co2))
+        self.publish_state("sensor/temperature", round(self.air_temperature, 1))
+        self.publish_state("expendables", f"[{self.filter_life}]")
+
+    def publish_diagnostics(self) -> None:
+        """Publish link quality metrics."""
+        self.publish_state("diag/rssi", random.randint(-80, -40))
+        self.publish_state("diag/mqtt_latency", random.randint(20, 300))
+        self.publish_state("diag/gw_latency", random.randint(5, 120))
+        self.publish_state("diag/gw_loss", random.choice((0, 0, 0, 1, 2, 5)))
+
+    def tick_boost(self) -> None:
+        """Advance the turbo countdown by one second."""
+        if not self.boost_remaining:
+            return
+        self.boost_remaining -= 1
+        self.publish_state("time", self.boost_remaining)
+        if not self.boost_remaining:
+            self.controls["mode"] = 1
+            self.publish_state("mode", 1)
+
+    def _command_received(self, message: ReceiveMessage) -> None:
+        """Apply a control command and echo it as state."""
+        key = message.topic.rsplit("/", 1)[1]
+        if key not in self.controls:
+            return
+        try:
+            value = int(float(message.payload))
+        except ValueError:
+            return
+        self.commands_received += 1
+        self.controls[key] = value
+        if key == "mode":
+            self.boost_remaining = BOOST_DURATION if value == MODE_BOOST else 0
+        self.publish_state(key, value)
+
+
+class FleetSimulator:
+    """Drive telemetry of many simulated devices from a single loop."""
+
+    def __init__(
+        self,
+        broker: InProcessBroker,
+        devices: int,
+        telemetry_interval: float = 5.0,
+        diagnostics_interval: float = 1.0,
+        device_type: str = DEVICE_TYPE,
+    ) -> None:
+        """Initialize the fleet."""
+        self.broker = broker
+        self.devices = [
+            SimulatedDevice(broker, f"{random.getrandbits(128):032x}", device_type)
+            for _ in range(devices)
+        ]
+        self.telemetry_interval = telemetry_interval
+        self.diagnostics_interval = diagnostics_interval
+        self._task: asyncio.Task | None = None
+
+    async def async_start(self) -> None:
+        """Bring all devices online and start publishing."""
+        for device in self.devices:
+            device.start()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def async_stop(self) -> None:
+        """Stop publishing and take all devices offline."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for device in self.devices:
+            device.stop()
+
+    async def _run(self) -> None:
+        """Publish due telemetry, diagnostics and countdowns each tick."""
+        loop = asyncio.get_running_loop()
+        next_telemetry = next_diagnostics = next_second = loop.time()
+        while True:
+            now = loop.time()
+            if now >= next_telemetry:
+                next_telemetry += self.telemetry_interval
+                for device in self.devices:
+                    device.publish_telemetry()
+            if now >= next_diagnostics:
+                next_diagnostics += self.diagnostics_interval
+                for device in self.devices:
+                    device.publish_diagnostics()
+            if now >= next_second:
+                next_second += 1
+                for device in self.devices:
+                    device.tick_boost()
+            await asyncio.sleep(
+                max(0, min(next_telemetry, next_diagnostics, next_second) - loop.time())
+            )
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    """Run a fleet against a counting subscriber and report throughput."""
+    broker = InProcessBroker()
+    received = 0
+
+    def count(message: ReceiveMessage) -> None:
+        nonlocal received
+        received += 1
+
+    broker.subscribe("rusclimate/+/+/state/#", count)
+    fleet = FleetSimulator(
+        broker, args.devices, args.telemetry_interval, args.diagnostics_interval
+    )
+    started = time.perf_counter()
+    await fleet.async_start()
+    # Put a tenth of the fleet into boost to exercise the countdown
+    for device in fleet.devices[: max(1, args.devices // 10)]:
+        broker.publish(f"{device.command_topic_base}/mode", str(MODE_BOOST))
+    await asyncio.sleep(args.duration)
+    await fleet.async_stop()
+    elapsed = time.perf_counter() - started
+    print(
+        f"{args.devices} devices, {broker.published} messages published, "
+        f"{received} received in {elapsed:.1f}s ({received / elapsed:.0f} msg/s)"
+    )
+
+
+def main() -> None:
+    """Parse arguments and run the simulator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--telemetry-interval", type=float, default=5.0)
+    parser.add_argument("--diagnostics-interval", type=float, default=1.0)
+    asyncio.run(_async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()